@@ -1,7 +1,9 @@
 import heapq
+from array import array
 import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+from Graph_Cache import load_cached
+from Graph_Render import DEFAULT_BUDGET, render
 
 class Node:
     def __init__(self, name, parent=None, g_cost=0, h_cost=0):
@@ -22,20 +24,8 @@ class Node:
         return path[::-1]
 
 def read_graph_and_heuristics_from_csv(filename):
-    df = pd.read_csv(filename)
-    graph = {}
-    heuristics = {}
-
-    for _, row in df.iterrows():
-        src, dest, weight, heuristic = row['Source'], row['Destination'], row['Weight'], row['Heuristic']
-
-        if src not in graph:
-            graph[src] = []
-        graph[src].append((dest, weight))
-
-        heuristics[src] = heuristic  
-
-    return graph, heuristics
+    graph = load_cached(filename, heuristic='Heuristic', heuristic_node='source')
+    return graph, graph.heuristics
 
 def a_star_search(graph, heuristics, start, goal):
     pq = []
@@ -76,20 +66,220 @@ def a_star_search(graph, heuristics, start, goal):
         print("\nNo path found to the goal!")
         draw_tree(search_tree, path_nodes)
 
-def draw_tree(tree, path_nodes):
-    pos = nx.spring_layout(tree, seed=40, k=2)
-    plt.figure(figsize=(12, 10))
+def _heuristic_view(heuristics, default):
+    # NodeValues give a NumPy array (read through a memoryview for fast
+    # scalar access); computed heuristics such as ALT are indexable as is.
+    values = heuristics.filled(default)
+    return memoryview(values) if isinstance(values, np.ndarray) else values
+
+class AStarResult:
+    def __init__(self, path, cost, expanded, pushed, skipped, max_open, tree=None):
+        self.path = path
+        self.cost = cost
+        self.expanded = expanded
+        self.pushed = pushed
+        self.skipped = skipped
+        self.max_open = max_open
+        self.tree = tree
+
+    def __repr__(self):
+        return (f"AStarResult(cost={self.cost}, length={len(self.path)}, expanded={self.expanded}, "
+                f"pushed={self.pushed}, skipped={self.skipped}, max_open={self.max_open})")
+
+def a_star_fast(graph, heuristics, start, goal, record_tree=False, trace=None):
+    # Quiet A* over a CSRGraph: g-costs and parents live in flat arrays
+    # indexed by node ID, a neighbour is only pushed when it improves its
+    # best known g, and stale heap entries are dropped on pop. Like
+    # a_star_search, expanded nodes are never reopened. The search tree is
+    # only built when record_tree is set. `trace` is an optional
+    # Graph_Trace.SearchTrace.
+    inf = float('inf')
+    if trace is not None:
+        trace.start("astar", start, goal, graph.names)
+    if start not in graph.ids or goal not in graph.ids:
+        if trace is not None:
+            trace.finish()
+        return AStarResult([], inf, 0, 0, 0, 0, nx.DiGraph() if record_tree else None)
+    n = graph.num_nodes
+    source, target = graph.ids[start], graph.ids[goal]
+    offsets = memoryview(graph.offsets)
+    targets = memoryview(graph.targets)
+    weights = memoryview(graph.weights)
+    h = _heuristic_view(heuristics, inf)
+
+    g = array('d', [inf]) * n
+    parent = array('l', [-1]) * n
+    closed = bytearray(n)
+    tree_edges = [] if record_tree else None
+    g[source] = 0.0
+    pq = [(h[source], source)]
+    expanded = skipped = 0
+    pushed = max_open = 1
+
+    while pq:
+        f, u = heapq.heappop(pq)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        expanded += 1
+        g_u = g[u]
+        if record_tree and parent[u] >= 0:
+            tree_edges.append((parent[u], u, g_u - g[parent[u]]))
+        if trace is not None:
+            trace.expand(u, g_u, len(pq))
+        if u == target:
+            if trace is not None:
+                trace.goal(u, g_u)
+            break
+        start_edge, end_edge = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[start_edge:end_edge].tolist(), weights[start_edge:end_edge].tolist()):
+            if closed[v]:
+                continue
+            cost = g_u + w
+            if cost >= g[v]:
+                skipped += 1
+                continue
+            g[v] = cost
+            parent[v] = u
+            heapq.heappush(pq, (cost + h[v], v))
+            pushed += 1
+            if trace is not None:
+                trace.push(v, u, cost)
+        if len(pq) > max_open:
+            max_open = len(pq)
 
-    edge_labels = nx.get_edge_attributes(tree, 'weight')
+    tree = None
+    if record_tree:
+        tree = nx.DiGraph()
+        for a, b, w in tree_edges:
+            tree.add_edge(graph.names[a], graph.names[b], weight=w)
+    if trace is not None:
+        trace.finish()
+    if not closed[target]:
+        return AStarResult([], inf, expanded, pushed, skipped, max_open, tree)
 
-    node_colors = ['lightblue' if node not in path_nodes else 'yellow' for node in tree.nodes()]
-    edge_colors = ['blue' if tree[u][v]['weight'] > 0 and (u in path_nodes and v in path_nodes) else 'gray' for u, v in tree.edges()]
+    path = []
+    node = target
+    while node >= 0:
+        path.append(graph.names[node])
+        node = parent[node]
+    return AStarResult(path[::-1], g[target], expanded, pushed, skipped, max_open, tree)
 
-    nx.draw(tree, pos, with_labels=True, node_size=1000, node_color=node_colors, font_size=8, font_weight="bold", edge_color=edge_colors, width=2)
-    nx.draw_networkx_edge_labels(tree, pos, edge_labels=edge_labels, font_size=10, font_weight="bold")
+def bidirectional_a_star(graph, heuristics, start, goal, start_heuristics=None):
+    # Bidirectional A* with average potentials: p(v) = (h_goal(v) - h_start(v)) / 2
+    # forward and -p(v) backward, which keeps both searches consistent when
+    # the heuristics are. The search can stop as soon as the two smallest
+    # open keys add up to the best meeting cost found. Missing heuristic
+    # values count as 0 here; h_start defaults to 0 everywhere.
+    inf = float('inf')
+    if start not in graph.ids or goal not in graph.ids:
+        return AStarResult([], inf, 0, 0, 0, 0)
+    s, t = graph.ids[start], graph.ids[goal]
+    h_goal = _heuristic_view(heuristics, 0.0)
+    h_start = _heuristic_view(start_heuristics, 0.0) if start_heuristics is not None else None
+
+    def potential(v):
+        return (h_goal[v] - (h_start[v] if h_start is not None else 0.0)) * 0.5
+
+    adjacency = []
+    for g in (graph, graph.reverse()):
+        adjacency.append((memoryview(g.offsets), memoryview(g.targets), memoryview(g.weights)))
+    dist = [{s: 0.0}, {t: 0.0}]
+    parent = [{s: -1}, {t: -1}]
+    closed = [set(), set()]
+    heaps = [[(potential(s), s)], [(-potential(t), t)]]
+    best, meet = (0.0, s) if s == t else (inf, -1)
+    expanded = skipped = 0
+    pushed = max_open = 2
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        sign = 1.0 if side == 0 else -1.0
+        _, u = heapq.heappop(heaps[side])
+        if u in closed[side]:
+            continue
+        closed[side].add(u)
+        expanded += 1
+        d_u = dist[side][u]
+        offsets, targets, weights = adjacency[side]
+        other = dist[1 - side]
+        for v, w in zip(targets[offsets[u]:offsets[u + 1]].tolist(), weights[offsets[u]:offsets[u + 1]].tolist()):
+            cost = d_u + w
+            if cost < dist[side].get(v, inf):
+                dist[side][v] = cost
+                parent[side][v] = u
+                heapq.heappush(heaps[side], (cost + sign * potential(v), v))
+                pushed += 1
+            else:
+                skipped += 1
+            if v in other and dist[side][v] + other[v] < best:
+                best, meet = dist[side][v] + other[v], v
+        max_open = max(max_open, len(heaps[0]) + len(heaps[1]))
+
+    if meet < 0:
+        return AStarResult([], inf, expanded, pushed, skipped, max_open)
+    forward, node = [], meet
+    while node >= 0:
+        forward.append(node)
+        node = parent[0][node]
+    backward, node = [], parent[1][meet]
+    while node >= 0:
+        backward.append(node)
+        node = parent[1][node]
+    path = [graph.names[i] for i in forward[::-1] + backward]
+    return AStarResult(path, best, expanded, pushed, skipped, max_open)
+
+def dijkstra_many(graph, start, goals):
+    # One uniform-cost sweep from `start` answering several goals: the CSV
+    # heuristic only estimates the distance to one goal, so it cannot guide
+    # a multi-goal search. Stops once every reachable goal is settled and
+    # returns {goal: (path, cost)} plus the number of expanded nodes.
+    inf = float('inf')
+    if start not in graph.ids:
+        return {goal: ([], inf) for goal in goals}, 0
+    offsets, targets, weights = memoryview(graph.offsets), memoryview(graph.targets), memoryview(graph.weights)
+    s = graph.ids[start]
+    wanted = {graph.ids[goal] for goal in goals if goal in graph.ids}
+    dist = {s: 0.0}
+    parent = {s: -1}
+    closed = set()
+    pq = [(0.0, s)]
+    expanded = 0
+
+    while pq and wanted:
+        d_u, u = heapq.heappop(pq)
+        if u in closed:
+            continue
+        closed.add(u)
+        wanted.discard(u)
+        expanded += 1
+        for v, w in zip(targets[offsets[u]:offsets[u + 1]].tolist(), weights[offsets[u]:offsets[u + 1]].tolist()):
+            cost = d_u + w
+            if cost < dist.get(v, inf):
+                dist[v] = cost
+                parent[v] = u
+                heapq.heappush(pq, (cost, v))
+
+    results = {}
+    for goal in goals:
+        i = graph.ids.get(goal)
+        if i not in closed:
+            results[goal] = ([], inf)
+            continue
+        path = []
+        node = i
+        while node >= 0:
+            path.append(graph.names[node])
+            node = parent[node]
+        results[goal] = (path[::-1], dist[i])
+    return results, expanded
 
-    plt.title("A* Search Tree with Costs", fontsize=12)
-    plt.show()
+def draw_tree(tree, path_nodes, out=None, budget=DEFAULT_BUDGET, hops=1, show=False):
+    out = render(tree, path_nodes, "A* Search Tree with Costs", out=out, budget=budget, hops=hops, show=show)
+    if out:
+        print(f"Saved search tree to {out}")
 
 def menu():
     while True:
@@ -119,4 +309,5 @@ def menu():
         else:
             print("Invalid choice! Please select a valid option.")
 
-menu()
+if __name__ == "__main__":
+    menu()
@@ -0,0 +1,74 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+# The binary layout shared by the graph cache and the model checkpoints:
+# an 8-byte magic string, version and header length ('<II'), a JSON header,
+# then every array at a 64-byte aligned offset so it can be memory-mapped
+# in place. The header's 'arrays' entry maps each name to
+# [offset, dtype, shape].
+
+ALIGN = 64
+
+def _aligned(size):
+    return -(-size // ALIGN) * ALIGN
+
+def write_array_file(path, magic, version, header, arrays):
+    # Written to a temporary file and renamed, so an interrupted write never
+    # leaves a truncated file behind.
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = [position, array.dtype.str, list(array.shape)]
+        position += _aligned(array.nbytes)
+    encoded = json.dumps(dict(header, arrays=layout)).encode('utf-8')
+    data_start = _aligned(len(magic) + 8 + len(encoded))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(magic + struct.pack('<II', version, len(encoded)) + encoded)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name][0])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(data_start + position)
+    os.replace(tmp_path, path)
+
+def read_array_header(path, magic, version, description):
+    # Returns (version found, header, data offset); the header is None when
+    # the version isn't the expected one, since its layout may differ.
+    with open(path, 'rb') as file:
+        if file.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a {description}")
+        found, length = struct.unpack('<II', file.read(8))
+        header = json.loads(file.read(length)) if found == version else None
+    return found, header, _aligned(len(magic) + 8 + length)
+
+def rewrite_header(path, magic, header):
+    # Replaces the JSON header without touching the arrays, padding it with
+    # spaces to the old length. Returns False (and changes nothing) when the
+    # new header doesn't fit.
+    encoded = json.dumps(header).encode('utf-8')
+    with open(path, 'r+b') as file:
+        file.seek(len(magic))
+        _, length = struct.unpack('<II', file.read(8))
+        if len(encoded) > length:
+            return False
+        file.write(encoded.ljust(length))
+    return True
+
+def read_arrays(path, header, data_start, mode='r'):
+    # mode 'r' maps the arrays read-only, so every process reading the same
+    # file shares one page-cached copy; 'c' maps them copy-on-write; None
+    # reads them into memory.
+    arrays = {}
+    for name, (offset, dtype, shape) in header['arrays'].items():
+        if mode is None or 0 in shape:
+            with open(path, 'rb') as file:
+                file.seek(data_start + offset)
+                count = int(np.prod(shape))
+                arrays[name] = np.fromfile(file, dtype=dtype, count=count).reshape(shape)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mode, offset=data_start + offset, shape=tuple(shape))
+    return arrays
@@ -1,37 +1,34 @@
-import pandas as pd
 import networkx as nx
-import matplotlib.pyplot as plt
 from collections import deque
+from Graph_Cache import load_cached
+from Graph_Render import DEFAULT_BUDGET, render, select_nodes
 
 def read_graph_from_csv(BFS):
-        df = pd.read_csv(BFS)
-        graph = {}
-        
-        for _, row in df.iterrows():
-            src, dest, weight = row['Source'], row['Destination'], row['Weight']
-            
-            if src not in graph:
-                graph[src] = []
-            if dest not in graph:
-                graph[dest] = []
-            
-            graph[src].append((dest, weight))
-            graph[dest].append((src, weight))
-        
-        return graph
+        return load_cached(BFS, undirected=True)
 
-def bfs(graph, start, goal):
+def bfs(graph, start, goal, verbose=True, trace=None):
+        # verbose=False drops the per-node prints; `trace` is an optional
+        # Graph_Trace.SearchTrace.
         queue = deque([start])
         visited = set([start])
         parent = {start: None}
+        if trace is not None:
+            trace.start("bfs", start, goal)
         
         while queue:
             node = queue.popleft()
             
-            print(f"Visiting Node: {node}")
+            if verbose:
+                print(f"Visiting Node: {node}")
+            if trace is not None:
+                trace.expand(node, None, len(queue))
             
             if node == goal:
-                print(f"Goal {goal} found!")
+                if verbose:
+                    print(f"Goal {goal} found!")
+                if trace is not None:
+                    trace.goal(node)
+                    trace.finish()
                 return reconstruct_path(parent, goal)
 
             for neighbor, weight in graph.get(node, []):
@@ -39,10 +36,92 @@ def bfs(graph, start, goal):
                     visited.add(neighbor)
                     parent[neighbor] = node
                     queue.append(neighbor)
+                    if trace is not None:
+                        trace.push(neighbor, node)
 
-        print(f"No path found from {start} to {goal}")
+        if verbose:
+            print(f"No path found from {start} to {goal}")
+        if trace is not None:
+            trace.finish()
         return []
 
+def _walk(parent, node):
+        path = []
+        while node >= 0:
+            path.append(node)
+            node = parent[node]
+        return path
+
+def bidirectional_bfs(graph, start, goal, reverse=None):
+        # Grows one BFS layer at a time from whichever side has the smaller
+        # frontier; after a layer in which the two searches touch, the
+        # shortest connection found is the shortest path. `reverse` is the
+        # graph with edges flipped (the graph itself for undirected ones).
+        # Returns the path and the number of expanded nodes.
+        if start not in graph.ids or goal not in graph.ids:
+            return [], 0
+        reverse = graph if reverse is None else reverse
+        s, t = graph.ids[start], graph.ids[goal]
+        if s == t:
+            return [start], 1
+        sides = [(graph, {s: -1}, {s: 0}), (reverse, {t: -1}, {t: 0})]
+        frontiers = [[s], [t]]
+        expanded = 0
+        best, meet = None, None
+
+        while frontiers[0] and frontiers[1] and best is None:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            adjacency, parent, depth = sides[side]
+            other_depth = sides[1 - side][2]
+            offsets, targets = memoryview(adjacency.offsets), memoryview(adjacency.targets)
+            next_frontier = []
+            for u in frontiers[side]:
+                expanded += 1
+                for v in targets[offsets[u]:offsets[u + 1]].tolist():
+                    if v not in parent:
+                        parent[v] = u
+                        depth[v] = depth[u] + 1
+                        next_frontier.append(v)
+                    if v in other_depth:
+                        length = depth[u] + 1 + other_depth[v]
+                        if best is None or length < best:
+                            best, meet = length, (u, v) if side == 0 else (v, u)
+            frontiers[side] = next_frontier
+
+        if best is None:
+            return [], expanded
+        u, v = meet
+        ids = _walk(sides[0][1], u)[::-1] + _walk(sides[1][1], v)
+        return [graph.names[i] for i in ids], expanded
+
+def bfs_many(graph, start, goals):
+        # One BFS sweep from `start` that stops once every goal is reached.
+        # Returns {goal: path} (empty when unreachable) and the expansions.
+        if start not in graph.ids:
+            return {goal: [] for goal in goals}, 0
+        wanted = {graph.ids[goal] for goal in goals if goal in graph.ids}
+        offsets, targets = memoryview(graph.offsets), memoryview(graph.targets)
+        s = graph.ids[start]
+        parent = {s: -1}
+        queue = deque([s])
+        wanted.discard(s)
+        expanded = 0
+
+        while queue and wanted:
+            u = queue.popleft()
+            expanded += 1
+            for v in targets[offsets[u]:offsets[u + 1]].tolist():
+                if v not in parent:
+                    parent[v] = u
+                    queue.append(v)
+                    wanted.discard(v)
+
+        paths = {}
+        for goal in goals:
+            i = graph.ids.get(goal)
+            paths[goal] = [graph.names[j] for j in _walk(parent, i)[::-1]] if i in parent else []
+        return paths, expanded
+
 def reconstruct_path(parent, goal):
         path = []
         while goal is not None:
@@ -50,35 +129,36 @@ def reconstruct_path(parent, goal):
             goal = parent[goal]
         return path[::-1]
 
-def visualize_bfs_tree(graph, path):
+def visualize_bfs_tree(graph, path, out=None, budget=DEFAULT_BUDGET, hops=1, show=False):
+        # Graphs within the budget are drawn whole. Larger ones only have the
+        # path and its neighbourhood pulled out of the CSR graph, so the cost
+        # doesn't grow with the size of the whole graph.
+        if len(graph) <= budget:
+            nodes = set(graph)
+        else:
+            nodes = set(select_nodes(path, lambda node: [n for n, _ in graph[node]], budget, hops))
         G = nx.Graph()
-        for node in graph:
+        G.add_nodes_from(nodes)
+        for node in nodes:
             for neighbor, weight in graph[node]:
-                G.add_edge(node, neighbor, weight=weight)
-        
-        pos = nx.spring_layout(G, seed=42)
-        plt.figure(figsize=(12, 10))
-
-        edge_labels = nx.get_edge_attributes(G, 'weight')
-        node_colors = ['yellow' if node in path else 'lightblue' for node in G.nodes()]
-        edge_colors = ['blue' if (u in path and v in path) else 'gray' for u, v in G.edges()]
-
-        nx.draw(G, pos, with_labels=True, node_size=1000, node_color=node_colors, font_size=12, font_weight="bold", edge_color=edge_colors, width=2)
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=10)
+                if neighbor in nodes:
+                    G.add_edge(node, neighbor, weight=weight)
 
-        plt.title("Breadth First Search Tree", fontsize=16)
-        plt.show()
+        out = render(G, path, "Breadth First Search Tree", out=out, budget=budget, hops=hops, show=show, font_size=10)
+        if out:
+            print(f"Saved search tree to {out}")
 
-graph = read_graph_from_csv('BFS.csv')
+if __name__ == "__main__":
+    graph = read_graph_from_csv('BFS.csv')
 
-start = input("Enter the start node: ")
-goal = input("Enter the goal node: ")
+    start = input("Enter the start node: ")
+    goal = input("Enter the goal node: ")
 
-print("\nBreadth First Search Traversal:")
-bfs_path = bfs(graph, start, goal)
+    print("\nBreadth First Search Traversal:")
+    bfs_path = bfs(graph, start, goal)
 
-if bfs_path:
-        print(f"\nBFS Path from {start} to {goal}: {' -> '.join(bfs_path)}")
-        visualize_bfs_tree(graph, bfs_path)
-else:
-        print("No path found!")
+    if bfs_path:
+            print(f"\nBFS Path from {start} to {goal}: {' -> '.join(bfs_path)}")
+            visualize_bfs_tree(graph, bfs_path)
+    else:
+            print("No path found!")
@@ -1,7 +1,7 @@
 import heapq
 import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
+from Graph_Cache import load_cached
+from Graph_Render import DEFAULT_BUDGET, render
 
 class Node:
     def __init__(self, name, parent=None, cost=0):
@@ -17,20 +17,8 @@ class Node:
         return path[::-1]
 
 def read_graph_and_heuristics_from_csv(filename):
-    df = pd.read_csv(filename)
-    graph = {}
-    heuristics = {}
-    
-    for _, row in df.iterrows():
-        src, dest, weight, heuristic = row['Source'], row['Destination'], row['Weight'], row['Heuristic']
-        
-        if src not in graph:
-            graph[src] = []
-        graph[src].append((dest, weight))
-        
-        heuristics[dest] = heuristic
-        
-    return graph, heuristics
+    graph = load_cached(filename, heuristic='Heuristic', heuristic_node='destination')
+    return graph, graph.heuristics
 
 def best_first_search(graph, heuristic, start, goal):
     pq = []
@@ -70,26 +58,67 @@ def best_first_search(graph, heuristic, start, goal):
         print("\nNo path found to the goal!")
         draw_tree(search_tree, path_nodes)
 
-def draw_tree(tree, path_nodes):
-    pos = nx.spring_layout(tree, seed=40, k=2) 
-    plt.figure(figsize=(12, 10))
-    
-    edge_labels = nx.get_edge_attributes(tree, 'weight')  
-    
-    node_colors = ['lightblue' if node not in path_nodes else 'yellow' for node in tree.nodes()]
-    edge_colors = ['blue' if tree[u][v]['weight'] > 0 and (u in path_nodes and v in path_nodes) else 'gray' for u, v in tree.edges()]
-    
-    nx.draw(tree, pos, with_labels=True, node_size=1000, node_color=node_colors, font_size=8, font_weight="bold", edge_color=edge_colors, width=2)
-    
-    nx.draw_networkx_edge_labels(tree, pos, edge_labels=edge_labels, font_size=10, font_weight="bold")
-    
-    plt.title("Best First Search Tree with Costs", fontsize=12)
-    plt.show()
-
-graph, heuristic = read_graph_and_heuristics_from_csv("BestFS.csv")
-
-start = input("Enter the start node: ")
-goal = input("Enter the goal node: ")
-
-print("\nBest First Search Tree:")
-best_first_search(graph, heuristic, start, goal)
+def best_first_fast(graph, heuristic, start, goal, trace=None):
+    # Quiet greedy best-first search over a CSRGraph with the same expansion
+    # order as best_first_search (ties go to the earlier push). Returns the
+    # path, its cost and the number of expanded nodes. `trace` is an optional
+    # Graph_Trace.SearchTrace.
+    if trace is not None:
+        trace.start("bestfs", start, goal, graph.names)
+    if start not in graph.ids or goal not in graph.ids:
+        if trace is not None:
+            trace.finish()
+        return [], float('inf'), 0
+    offsets, targets, weights = memoryview(graph.offsets), memoryview(graph.targets), memoryview(graph.weights)
+    h = memoryview(heuristic.filled(float('inf')))
+    s, t = graph.ids[start], graph.ids[goal]
+    parent = {}
+    cost = {}
+    pq = [(h[s], 0, s, -1, 0)]
+    pushes = 1
+    expanded = 0
+
+    while pq:
+        _, _, u, p, c = heapq.heappop(pq)
+        if u in parent:
+            continue
+        parent[u] = p
+        cost[u] = c
+        expanded += 1
+        if trace is not None:
+            trace.expand(u, c, len(pq))
+        if u == t:
+            if trace is not None:
+                trace.goal(u, c)
+            break
+        for v, w in zip(targets[offsets[u]:offsets[u + 1]].tolist(), weights[offsets[u]:offsets[u + 1]].tolist()):
+            if v not in parent:
+                heapq.heappush(pq, (h[v], pushes, v, u, c + w))
+                pushes += 1
+                if trace is not None:
+                    trace.push(v, u, c + w)
+
+    if trace is not None:
+        trace.finish()
+    if t not in parent:
+        return [], float('inf'), expanded
+    path = []
+    node = t
+    while node >= 0:
+        path.append(graph.names[node])
+        node = parent[node]
+    return path[::-1], cost[t], expanded
+
+def draw_tree(tree, path_nodes, out=None, budget=DEFAULT_BUDGET, hops=1, show=False):
+    out = render(tree, path_nodes, "Best First Search Tree with Costs", out=out, budget=budget, hops=hops, show=show)
+    if out:
+        print(f"Saved search tree to {out}")
+
+if __name__ == "__main__":
+    graph, heuristic = read_graph_and_heuristics_from_csv("BestFS.csv")
+
+    start = input("Enter the start node: ")
+    goal = input("Enter the goal node: ")
+
+    print("\nBest First Search Tree:")
+    best_first_search(graph, heuristic, start, goal)
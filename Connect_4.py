@@ -1,28 +1,301 @@
 import numpy as np
 import pygame
+import os
 import sys
 import copy
 import time
+import random
+from array import array
+
+def score_window_counts(own, opp, empty):
+    score = 0
+    if own == 4:
+        score += 100
+    elif own == 3 and empty == 1:
+        score += 5
+    elif own == 2 and empty == 2:
+        score += 2
+    if opp == 3 and empty == 1:
+        score -= 4
+    return score
+
+class Bitboard:
+    # Column-major layout: bit (col * H + row), row 0 at the bottom. The extra
+    # sentinel row per column keeps shift-and-AND win checks from wrapping.
+    ROWS = 6
+    COLS = 7
+    H = ROWS + 1
 
-class Connect4:
     def __init__(self):
+        self.masks = [0, 0]
+        self.heights = [c * self.H for c in range(self.COLS)]
+        self.moves = []
+        self.hash = 0
+        # Per-window piece counts and the running heuristic score for each
+        # piece, updated on play/undo so leaf evaluation is a lookup.
+        self.counts = [[0] * len(WINDOWS), [0] * len(WINDOWS)]
+        self.scores = [0, 0]
+
+    @classmethod
+    def from_array(cls, board, player=1, ai=2):
+        position = cls()
+        for c in range(cls.COLS):
+            for r in range(cls.ROWS - 1, -1, -1):
+                if board[r][c] == player:
+                    position.play(c, player)
+                elif board[r][c] == ai:
+                    position.play(c, ai)
+                else:
+                    break
+        return position
+
+    def to_array(self):
+        board = np.zeros((self.ROWS, self.COLS))
+        for c in range(self.COLS):
+            for h in range(self.heights[c] - c * self.H):
+                bit = 1 << (c * self.H + h)
+                board[self.ROWS - 1 - h][c] = 1 if self.masks[0] & bit else 2
+        return board
+
+    def copy(self):
+        position = Bitboard.__new__(Bitboard)
+        position.masks = list(self.masks)
+        position.heights = list(self.heights)
+        position.moves = list(self.moves)
+        position.hash = self.hash
+        position.counts = [list(self.counts[0]), list(self.counts[1])]
+        position.scores = list(self.scores)
+        return position
+
+    def can_play(self, col):
+        return self.heights[col] < col * self.H + self.ROWS
+
+    def valid_moves(self):
+        return [col for col in range(self.COLS) if self.heights[col] < col * self.H + self.ROWS]
+
+    def play(self, col, piece):
+        bit = self.heights[col]
+        self.masks[piece - 1] |= 1 << bit
+        self.hash ^= ZOBRIST[piece - 1][bit]
+        self.heights[col] = bit + 1
+        self.moves.append((col, piece))
+        self._update_scores(bit, piece, 1)
+        return self.ROWS - 1 - (bit - col * self.H)
+
+    def undo(self):
+        col, piece = self.moves.pop()
+        self.heights[col] -= 1
+        bit = self.heights[col]
+        self.masks[piece - 1] ^= 1 << bit
+        self.hash ^= ZOBRIST[piece - 1][bit]
+        self._update_scores(bit, piece, -1)
+        return col
+
+    def _update_scores(self, bit, piece, delta):
+        first, second = self.counts
+        own = first if piece == 1 else second
+        score_first, score_second = self.scores
+        for w in CELL_WINDOWS[bit]:
+            a, b = first[w], second[w]
+            score_first -= WINDOW_SCORES[a][b]
+            score_second -= WINDOW_SCORES[b][a]
+            own[w] += delta
+            a, b = first[w], second[w]
+            score_first += WINDOW_SCORES[a][b]
+            score_second += WINDOW_SCORES[b][a]
+        if bit // self.H == self.COLS // 2:
+            if piece == 1:
+                score_first += 3 * delta
+            else:
+                score_second += 3 * delta
+        self.scores[0] = score_first
+        self.scores[1] = score_second
+
+    def is_win(self, piece):
+        m = self.masks[piece - 1]
+        for shift in (1, self.H - 1, self.H, self.H + 1):
+            mm = m & (m >> shift)
+            if mm & (mm >> (2 * shift)):
+                return True
+        return False
+
+    def key(self, maximizingPlayer):
+        return self.hash if maximizingPlayer else self.hash ^ SIDE_KEY
+
+    def is_full(self):
+        return len(self.moves) == self.ROWS * self.COLS
+
+# Fixed seed so hashes are stable across runs and processes.
+_zobrist_rng = random.Random(0xC4)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(Bitboard.COLS * Bitboard.H)] for _ in range(2)]
+SIDE_KEY = _zobrist_rng.getrandbits(64)
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    # Two-tier buckets: slot 2*i keeps the deepest search seen for that bucket,
+    # slot 2*i+1 always takes the newest entry. Flat typed arrays keep the
+    # memory footprint fixed at about 15 bytes per slot.
+    def __init__(self, entries=1 << 19):
+        buckets = 1
+        while buckets * 2 < entries:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.size = buckets * 2
+        self.keys = array('Q', [0]) * self.size
+        self.depths = array('b', [-1]) * self.size
+        self.values = array('i', [0]) * self.size
+        self.flags = array('b', [0]) * self.size
+        self.moves = array('b', [-1]) * self.size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        slot = (key & self.mask) * 2
+        for i in (slot, slot + 1):
+            if self.depths[i] >= 0:
+                if self.keys[i] == key:
+                    self.hits += 1
+                    return i
+                self.collisions += 1
+        self.misses += 1
+        return -1
+
+    def store(self, key, depth, value, flag, move):
+        slot = (key & self.mask) * 2
+        if self.keys[slot] == key or self.depths[slot] <= depth:
+            if self.depths[slot] >= 0 and self.keys[slot] != key:
+                # Demote the shallower entry to the always-replace slot.
+                self._write(slot + 1, self.keys[slot], self.depths[slot], self.values[slot], self.flags[slot], self.moves[slot])
+            self._write(slot, key, depth, value, flag, move)
+        else:
+            self._write(slot + 1, key, depth, value, flag, move)
+
+    def _write(self, i, key, depth, value, flag, move):
+        if self.depths[i] >= 0 and self.keys[i] != key:
+            self.overwrites += 1
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.values[i] = value
+        self.flags[i] = flag
+        self.moves[i] = -1 if move is None else move
+
+    def clear(self):
+        self.depths = array('b', [-1]) * self.size
+        self.hits = self.misses = self.collisions = self.overwrites = 0
+
+    def stats(self):
+        used = sum(1 for d in self.depths if d >= 0)
+        nbytes = sum(a.itemsize * len(a) for a in (self.keys, self.depths, self.values, self.flags, self.moves))
+        return {'size': self.size, 'used': used, 'bytes': nbytes, 'hits': self.hits,
+                'misses': self.misses, 'collisions': self.collisions, 'overwrites': self.overwrites}
+
+CENTER_ORDER = [3, 2, 4, 1, 5, 0, 6]
+
+class SearchTimeout(Exception):
+    pass
+
+class SearchInfo:
+    # Per-move search state: node counter, deadline, principal-variation move
+    # for the root, and killer/history tables for move ordering.
+    def __init__(self, deadline=None, max_ply=Bitboard.ROWS * Bitboard.COLS):
+        self.deadline = deadline
+        self.nodes = 0
+        self.pv_move = None
+        self.killers = [[None, None] for _ in range(max_ply + 1)]
+        self.history = [[0] * Bitboard.COLS for _ in range(2)]
+
+    def visit(self):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 1023 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    def order(self, valid_moves, ply, tt_move, maximizingPlayer):
+        first = self.pv_move if ply == 0 and self.pv_move is not None else tt_move
+        killers = self.killers[ply]
+        history = self.history[0 if maximizingPlayer else 1]
+
+        def rank(col):
+            if col == first:
+                return (0, 0, 0)
+            if col in killers:
+                return (1, killers.index(col), 0)
+            return (2, -history[col], CENTER_ORDER.index(col))
+        return sorted(valid_moves, key=rank)
+
+    def cutoff(self, col, ply, depth, maximizingPlayer):
+        killers = self.killers[ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self.history[0 if maximizingPlayer else 1][col] += depth * depth
+
+class SearchResult:
+    def __init__(self, move, value, depth, nodes, elapsed, pv):
+        self.move = move
+        self.value = value
+        self.depth = depth
+        self.nodes = nodes
+        self.total_nodes = sum(nodes)
+        self.elapsed = elapsed
+        self.pv = pv
+        if len(nodes) >= 2 and nodes[-2] > 0:
+            self.branching_factor = nodes[-1] / nodes[-2]
+        else:
+            self.branching_factor = float(nodes[-1]) if nodes else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(move={self.move}, value={self.value}, depth={self.depth}, "
+                f"nodes={self.total_nodes}, ebf={self.branching_factor:.2f}, time={self.elapsed:.3f}s)")
+
+def _build_windows():
+    H = Bitboard.H
+    windows = []
+    for c in range(Bitboard.COLS):
+        for r in range(Bitboard.ROWS):
+            for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                cells = [(c + i * dc, r + i * dr) for i in range(4)]
+                if all(0 <= cc < Bitboard.COLS and 0 <= rr < Bitboard.ROWS for cc, rr in cells):
+                    windows.append(sum(1 << (cc * H + rr) for cc, rr in cells))
+    return windows
+
+WINDOWS = _build_windows()
+CELL_WINDOWS = [[w for w, window in enumerate(WINDOWS) if window >> bit & 1] for bit in range(Bitboard.COLS * Bitboard.H)]
+WINDOW_SCORES = [[score_window_counts(own, opp, 4 - own - opp) if own + opp <= 4 else 0 for opp in range(5)] for own in range(5)]
+
+class Connect4:
+    def __init__(self, headless=False, table_entries=1 << 19, book_path=None, endgame_threshold=14):
         self.ROWS = 6
         self.COLS = 7
         self.board = np.zeros((self.ROWS, self.COLS))
         self.PLAYER = 1
         self.AI = 2
         self.EMPTY = 0
+        self.headless = headless
+        self.table = TranspositionTable(table_entries)
+        self.endgame_table = TranspositionTable(1 << 18)
+        self.endgame_threshold = endgame_threshold
+        self.book = None
+        if book_path is not None and os.path.exists(book_path):
+            from Connect_4_Book import OpeningBook
+            self.book = OpeningBook(book_path)
 
-        pygame.init()
         self.SQUARESIZE = 60
         self.width = self.COLS * self.SQUARESIZE
         self.height = (self.ROWS + 1) * self.SQUARESIZE
         self.RADIUS = int(self.SQUARESIZE / 2 - 5)
+        if headless:
+            return
+        pygame.init()
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Connect 4")
         self.font = pygame.font.SysFont("monospace", 75)
 
     def drop_piece(self, board, col, piece):
+        if isinstance(board, Bitboard):
+            return board.play(col, piece) if board.can_play(col) else -1
         for row in range(self.ROWS-1, -1, -1):
             if board[row][col] == self.EMPTY:
                 board[row][col] = piece
@@ -30,12 +303,18 @@ class Connect4:
         return -1
 
     def is_valid_move(self, board, col):
+        if isinstance(board, Bitboard):
+            return board.can_play(col)
         return board[0][col] == self.EMPTY
 
     def get_valid_moves(self, board):
+        if isinstance(board, Bitboard):
+            return board.valid_moves()
         return [col for col in range(self.COLS) if self.is_valid_move(board, col)]
 
     def check_winner(self, board, piece):
+        if isinstance(board, Bitboard):
+            return board.is_win(piece)
         for r in range(self.ROWS):
             for c in range(self.COLS-3):
                 if all(board[r][c+i] == piece for i in range(4)):
@@ -56,9 +335,13 @@ class Connect4:
         return False
 
     def is_terminal(self, board):
+        if isinstance(board, Bitboard):
+            return board.is_win(self.PLAYER) or board.is_win(self.AI) or board.is_full()
         return self.check_winner(board, self.PLAYER) or self.check_winner(board, self.AI) or len(self.get_valid_moves(board)) == 0
 
     def evaluate_position(self, board, piece):
+        if isinstance(board, Bitboard):
+            return board.scores[piece - 1]
        
         score = 0
         opponent = self.PLAYER if piece == self.AI else self.AI
@@ -89,18 +372,12 @@ class Connect4:
         return score
 
     def evaluate_window(self, window, piece, opponent):
-        score = 0
-        if window.count(piece) == 4:
-            score += 100
-        elif window.count(piece) == 3 and window.count(self.EMPTY) == 1:
-            score += 5
-        elif window.count(piece) == 2 and window.count(self.EMPTY) == 2:
-            score += 2
-        if window.count(opponent) == 3 and window.count(self.EMPTY) == 1:
-            score -= 4
-        return score
+        return score_window_counts(window.count(piece), window.count(opponent), window.count(self.EMPTY))
+
+    def minimax(self, board, depth, alpha, beta, maximizingPlayer, table=None):
+        if isinstance(board, Bitboard):
+            return self.minimax_bitboard(board, depth, alpha, beta, maximizingPlayer, table)
 
-    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
         if depth == 0 or self.is_terminal(board):
             if self.is_terminal(board):
                 if self.check_winner(board, self.AI):
@@ -141,6 +418,222 @@ class Connect4:
                     break
             return best_col, value
 
+    def minimax_bitboard(self, position, depth, alpha, beta, maximizingPlayer, table=None, search=None, ply=0):
+        # Same search as minimax, but make/unmake on one position instead of
+        # deep-copying a float array per child. With a table, cached bounds
+        # cut the search short and the stored best move is tried first; with
+        # a SearchInfo, moves are ordered by PV, killers and history.
+        if search is not None:
+            search.visit()
+        if position.is_win(self.AI):
+            return None, 1000000
+        if position.is_win(self.PLAYER):
+            return None, -1000000
+        if position.is_full():
+            return None, 0
+        if depth == 0:
+            return None, self.evaluate_position(position, self.AI)
+
+        valid_moves = position.valid_moves()
+        tt_move = None
+
+        if table is not None:
+            key = position.key(maximizingPlayer)
+            alpha_orig, beta_orig = alpha, beta
+            slot = table.probe(key)
+            if slot >= 0:
+                tt_move = table.moves[slot]
+                if table.depths[slot] >= depth:
+                    tt_value, flag = table.values[slot], table.flags[slot]
+                    if flag == EXACT:
+                        return tt_move, tt_value
+                    if flag == LOWER:
+                        alpha = max(alpha, tt_value)
+                    else:
+                        beta = min(beta, tt_value)
+                    if alpha >= beta:
+                        return tt_move, tt_value
+
+        if search is not None:
+            valid_moves = search.order(valid_moves, ply, tt_move, maximizingPlayer)
+        elif tt_move in valid_moves:
+            valid_moves.remove(tt_move)
+            valid_moves.insert(0, tt_move)
+
+        best_col, value = self._search_children(position, valid_moves, depth, alpha, beta, maximizingPlayer, table, search, ply)
+
+        if table is not None:
+            if value <= alpha_orig:
+                flag = UPPER
+            elif value >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(key, depth, value, flag, best_col)
+        return best_col, value
+
+    def _search_children(self, position, valid_moves, depth, alpha, beta, maximizingPlayer, table, search, ply):
+        best_col = valid_moves[0]
+
+        if maximizingPlayer:
+            value = float('-inf')
+            for col in valid_moves:
+                position.play(col, self.AI)
+                new_score = self.minimax_bitboard(position, depth-1, alpha, beta, False, table, search, ply+1)[1]
+                position.undo()
+                if new_score > value:
+                    value = new_score
+                    best_col = col
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    if search is not None:
+                        search.cutoff(col, ply, depth, True)
+                    break
+            return best_col, value
+        else:
+            value = float('inf')
+            for col in valid_moves:
+                position.play(col, self.PLAYER)
+                new_score = self.minimax_bitboard(position, depth-1, alpha, beta, True, table, search, ply+1)[1]
+                position.undo()
+                if new_score < value:
+                    value = new_score
+                    best_col = col
+                beta = min(beta, value)
+                if alpha >= beta:
+                    if search is not None:
+                        search.cutoff(col, ply, depth, False)
+                    break
+            return best_col, value
+
+    def iterative_deepening(self, position, time_limit=1.0, max_depth=None, maximizingPlayer=True, table=None):
+        # Search depth 1, 2, ... until the time budget runs out and return the
+        # deepest fully completed iteration.
+        start = time.perf_counter()
+        table = self.table if table is None else table
+        position = position.copy()
+        empty = Bitboard.ROWS * Bitboard.COLS - len(position.moves)
+        max_depth = empty if max_depth is None else min(max_depth, empty)
+        search = SearchInfo(start + time_limit)
+        result = None
+        nodes = []
+
+        for depth in range(1, max_depth + 1):
+            before = search.nodes
+            try:
+                col, value = self.minimax_bitboard(position, depth, float('-inf'), float('inf'), maximizingPlayer, table, search)
+            except SearchTimeout:
+                break
+            nodes.append(search.nodes - before)
+            search.pv_move = col
+            result = SearchResult(col, value, depth, list(nodes), time.perf_counter() - start,
+                                  self.principal_variation(position, table, maximizingPlayer, depth))
+            if abs(value) >= 1000000 or time.perf_counter() >= search.deadline:
+                break
+
+        if result is None:
+            # Not even depth 1 finished; fall back to the best-ordered legal move.
+            moves = search.order(position.valid_moves(), 0, None, maximizingPlayer)
+            result = SearchResult(moves[0], 0, 0, [search.nodes], time.perf_counter() - start, [moves[0]])
+        return result
+
+    def principal_variation(self, position, table, maximizingPlayer, depth):
+        pv = []
+        position = position.copy()
+        for _ in range(depth):
+            slot = table.probe(position.key(maximizingPlayer))
+            if slot < 0 or not 0 <= table.moves[slot] < Bitboard.COLS or not position.can_play(table.moves[slot]):
+                break
+            col = table.moves[slot]
+            pv.append(col)
+            position.play(col, self.AI if maximizingPlayer else self.PLAYER)
+            if position.is_win(self.AI) or position.is_win(self.PLAYER):
+                break
+            maximizingPlayer = not maximizingPlayer
+        return pv
+
+    def solve_endgame(self, position, maximizingPlayer=True):
+        # Exact search to the end of the game. A win scores 1000000 plus the
+        # cells still empty, so quicker wins (and slower losses) are preferred.
+        return self._solve(position.copy(), float('-inf'), float('inf'), maximizingPlayer, self.endgame_table)
+
+    def _solve(self, position, alpha, beta, maximizingPlayer, table):
+        empty = Bitboard.ROWS * Bitboard.COLS - len(position.moves)
+        if position.is_win(self.AI):
+            return None, 1000000 + empty
+        if position.is_win(self.PLAYER):
+            return None, -1000000 - empty
+        if empty == 0:
+            return None, 0
+
+        piece = self.AI if maximizingPlayer else self.PLAYER
+        valid_moves = [col for col in CENTER_ORDER if position.can_play(col)]
+        for col in valid_moves:
+            position.play(col, piece)
+            won = position.is_win(piece)
+            position.undo()
+            if won:
+                return col, (1000000 + empty - 1) * (1 if maximizingPlayer else -1)
+
+        key = position.key(maximizingPlayer)
+        alpha_orig, beta_orig = alpha, beta
+        slot = table.probe(key)
+        if slot >= 0:
+            tt_move, tt_value, flag = table.moves[slot], table.values[slot], table.flags[slot]
+            if flag == EXACT:
+                return tt_move, tt_value
+            if flag == LOWER:
+                alpha = max(alpha, tt_value)
+            else:
+                beta = min(beta, tt_value)
+            if alpha >= beta:
+                return tt_move, tt_value
+            if tt_move in valid_moves:
+                valid_moves.remove(tt_move)
+                valid_moves.insert(0, tt_move)
+
+        best_col = valid_moves[0]
+        value = float('-inf') if maximizingPlayer else float('inf')
+        for col in valid_moves:
+            position.play(col, piece)
+            new_score = self._solve(position, alpha, beta, not maximizingPlayer, table)[1]
+            position.undo()
+            if maximizingPlayer:
+                if new_score > value:
+                    value = new_score
+                    best_col = col
+                alpha = max(alpha, value)
+            else:
+                if new_score < value:
+                    value = new_score
+                    best_col = col
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(key, empty, value, flag, best_col)
+        return best_col, value
+
+    def choose_move(self, position, piece, time_limit=1.0, depth=None):
+        # Opening book first, then the exact solver once few cells remain,
+        # otherwise a regular search.
+        maximizingPlayer = piece == self.AI
+        if self.book is not None:
+            col = self.book.lookup(position, maximizingPlayer)
+            if col is not None and position.can_play(col):
+                return col
+        if Bitboard.ROWS * Bitboard.COLS - len(position.moves) <= self.endgame_threshold:
+            return self.solve_endgame(position, maximizingPlayer)[0]
+        if depth is not None:
+            return self.minimax_bitboard(position.copy(), depth, float('-inf'), float('inf'), maximizingPlayer, self.table)[0]
+        return self.iterative_deepening(position, time_limit, maximizingPlayer=maximizingPlayer).move
+
     def draw_board(self):
 
         self.screen.fill((0, 0, 0))
@@ -161,7 +654,14 @@ class Connect4:
 
         pygame.display.update()
 
-    def play_game(self):
+    def play_game(self, time_limit=1.0, ai="minimax"):
+        if self.headless:
+            raise RuntimeError("play_game needs the pygame window; create Connect4() without headless=True")
+        if ai == "mcts":
+            from Connect_4_MCTS import MCTSPlayer
+            mcts = MCTSPlayer(time_limit=time_limit)
+        elif ai != "minimax":
+            raise ValueError(f"Unknown AI '{ai}', expected 'minimax' or 'mcts'")
       
         game_over = False
         turn = 0
@@ -182,12 +682,19 @@ class Connect4:
                         turn = 1
 
             if turn == 1 and not game_over:
-                col, _ = self.minimax(self.board, 4, float('-inf'), float('inf'), True)
+                position = Bitboard.from_array(self.board, self.PLAYER, self.AI)
+                if ai == "mcts":
+                    col = mcts.choose_move(position, self.AI)
+                else:
+                    col = self.choose_move(position, self.AI, time_limit)
                 self.drop_piece(self.board, col, self.AI)
                 self.draw_board()
                 if self.check_winner(self.board, self.AI):
                     game_over = True
                 turn = 0
 
+BOOK_FILE = "Connect_4_book.npy"
+
 if __name__ == "__main__":
-    Connect4().play_game()
+    ai = sys.argv[1] if len(sys.argv) > 1 else "minimax"
+    Connect4(book_path=BOOK_FILE).play_game(ai=ai)
@@ -0,0 +1,131 @@
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from Connect_4 import Connect4, Bitboard, TranspositionTable, SearchInfo
+
+# Positions as column strings, players alternating with the human (1) first.
+POSITIONS = {
+    'empty': '',
+    'center': '3',
+    'opening': '334455',
+    'middlegame': '3332244511',
+    'crowded': '33322445116600',
+    'late': '3332244511660066552211',
+}
+
+# No column fills and nobody wins within 6 plies, so the empty board has 7**n.
+EMPTY_PERFT = {n: 7 ** n for n in range(7)}
+
+def position_from_moves(moves):
+    position = Bitboard()
+    piece = 1
+    for ch in moves:
+        position.play(int(ch), piece)
+        piece = 3 - piece
+    return position, piece
+
+def perft(position, depth, piece):
+    # Number of legal move sequences of length `depth`; sequences cut short
+    # by a win are not counted.
+    if depth == 0:
+        return 1
+    total = 0
+    for col in position.valid_moves():
+        position.play(col, piece)
+        if depth == 1:
+            total += 1
+        elif not position.is_win(piece):
+            total += perft(position, depth - 1, 3 - piece)
+        position.undo()
+    return total
+
+def perft_array(game, board, depth, piece):
+    if depth == 0:
+        return 1
+    total = 0
+    for col in game.get_valid_moves(board):
+        child = board.copy()
+        game.drop_piece(child, col, piece)
+        if depth == 1:
+            total += 1
+        elif not game.check_winner(child, piece):
+            total += perft_array(game, child, depth - 1, 3 - piece)
+    return total
+
+def time_calls(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {'calls': repeat, 'seconds': elapsed, 'us_per_call': elapsed / repeat * 1e6}
+
+def bench_search(game, position, depth, maximizingPlayer):
+    table = TranspositionTable(1 << 18)
+    search = SearchInfo()
+    start = time.perf_counter()
+    col, value = game.minimax_bitboard(position.copy(), depth, float('-inf'), float('inf'), maximizingPlayer, table, search)
+    elapsed = time.perf_counter() - start
+    return {'depth': depth, 'move': col, 'value': value, 'nodes': search.nodes, 'seconds': elapsed,
+            'nodes_per_second': search.nodes / elapsed if elapsed else 0.0}
+
+def run(depths=(2, 4, 6), perft_depth=5, check_depth=4, repeat=2000):
+    game = Connect4(headless=True)
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'positions': {}, 'ok': True}
+
+    for name, moves in POSITIONS.items():
+        position, piece = position_from_moves(moves)
+        board = position.to_array()
+        maximizingPlayer = piece == game.AI
+        entry = {'moves': moves}
+
+        start = time.perf_counter()
+        count = perft(position, perft_depth, piece)
+        entry['perft'] = {'depth': perft_depth, 'count': count, 'seconds': time.perf_counter() - start}
+        expected = perft_array(game, board, check_depth, piece)
+        correct = perft(position, check_depth, piece) == expected
+        if moves == '' and perft_depth in EMPTY_PERFT:
+            correct = correct and count == EMPTY_PERFT[perft_depth]
+        entry['perft']['correct'] = correct
+        report['ok'] = report['ok'] and correct
+
+        entry['check_winner'] = {
+            'array': time_calls(lambda: game.check_winner(board, piece), repeat),
+            'bitboard': time_calls(lambda: game.check_winner(position, piece), repeat),
+        }
+        entry['evaluate_position'] = {
+            'array': time_calls(lambda: game.evaluate_position(board, game.AI), repeat),
+            'bitboard': time_calls(lambda: game.evaluate_position(position, game.AI), repeat),
+        }
+        entry['search'] = [bench_search(game, position, d, maximizingPlayer) for d in depths]
+        report['positions'][name] = entry
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 engine benchmark and perft check")
+    parser.add_argument("--out", default="connect4_bench.json")
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 6])
+    parser.add_argument("--perft-depth", type=int, default=5)
+    parser.add_argument("--check-depth", type=int, default=4, help="depth compared against the array engine")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    report = run(args.depths, args.perft_depth, args.check_depth, args.repeat)
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=1)
+
+    for name, entry in report['positions'].items():
+        deepest = entry['search'][-1]
+        print(f"{name:12s} perft({entry['perft']['depth']})={entry['perft']['count']:>8d} "
+              f"{'ok' if entry['perft']['correct'] else 'MISMATCH'}  "
+              f"depth {deepest['depth']}: {deepest['nodes']} nodes, {deepest['nodes_per_second']:.0f} nodes/s")
+    print(f"Results written to {args.out}")
+    if not report['ok']:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
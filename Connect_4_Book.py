@@ -0,0 +1,126 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from Connect_4 import Connect4, Bitboard, BOOK_FILE
+
+# Entries are not perfect play: each one is the move of a depth-limited
+# iterative_deepening search (depth 10, 5 s per position by default). `value`
+# is that search's score from the AI's side (piece 2, positive is good for
+# it): +-1000000 for a win found within the depth, otherwise the heuristic
+# evaluation at the deepest completed depth, clamped to int32. Lookups only
+# use the move.
+BOOK_DTYPE = np.dtype([('key', '<u8'), ('move', 'i1'), ('value', '<i4')])
+
+def canonical_key(position, maximizingPlayer):
+    # A position and its left-right mirror share one entry; the flag says
+    # whether the stored move has to be mirrored back.
+    mirrored = Bitboard()
+    for col, piece in position.moves:
+        mirrored.play(Bitboard.COLS - 1 - col, piece)
+    key = position.key(maximizingPlayer)
+    mirror_key = mirrored.key(maximizingPlayer)
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
+
+class OpeningBook:
+    # The book is a .npy array of (key, move, value) records sorted by key,
+    # memory-mapped read-only so processes share the same pages.
+    def __init__(self, path):
+        self.entries = np.load(path, mmap_mode='r')
+        if self.entries.dtype != BOOK_DTYPE:
+            raise ValueError(f"{path} is not a Connect 4 opening book")
+        self.keys = self.entries['key']
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, position, maximizingPlayer):
+        key, mirrored = canonical_key(position, maximizingPlayer)
+        i = np.searchsorted(self.keys, np.uint64(key))
+        if i >= len(self.keys) or self.keys[i] != key:
+            return None
+        col = int(self.entries['move'][i])
+        return Bitboard.COLS - 1 - col if mirrored else col
+
+def enumerate_positions(plies):
+    # Every non-terminal position up to `plies` moves, for either side
+    # starting, keyed canonically so transpositions and mirrors are searched once.
+    seen = {}
+    for first in (1, 2):
+        frontier = [Bitboard()]
+        for ply in range(plies + 1):
+            piece = first if ply % 2 == 0 else 3 - first
+            maximizingPlayer = piece == 2
+            next_frontier = []
+            for position in frontier:
+                key, mirrored = canonical_key(position, maximizingPlayer)
+                if key in seen:
+                    continue
+                seen[key] = (list(position.moves), maximizingPlayer)
+                if ply == plies:
+                    continue
+                for col in position.valid_moves():
+                    child = position.copy()
+                    child.play(col, piece)
+                    if not child.is_win(piece):
+                        next_frontier.append(child)
+            frontier = next_frontier
+    return seen
+
+_engine = None
+
+def _search_entry(args):
+    global _engine
+    key, moves, maximizingPlayer, depth, time_limit = args
+    if _engine is None:
+        _engine = Connect4(headless=True)
+    position = Bitboard()
+    for col, piece in moves:
+        position.play(col, piece)
+    result = _engine.iterative_deepening(position, time_limit, depth, maximizingPlayer)
+    col = result.move
+    if canonical_key(position, maximizingPlayer)[1]:
+        col = Bitboard.COLS - 1 - col
+    # Heuristic score of the depth-limited search, not a solved value.
+    value = max(-2**31, min(2**31 - 1, int(result.value)))
+    return key, col, value
+
+def build_book(path, plies=4, depth=10, time_limit=5.0, workers=None):
+    # Adds entries for every position up to `plies` that the existing book
+    # (if any) does not cover yet, then rewrites the file sorted by key.
+    existing = np.load(path) if os.path.exists(path) else np.zeros(0, dtype=BOOK_DTYPE)
+    known = set(existing['key'].tolist())
+    jobs = [(key, moves, maximizingPlayer, depth, time_limit)
+            for key, (moves, maximizingPlayer) in enumerate_positions(plies).items() if key not in known]
+    print(f"{len(known)} positions in book, {len(jobs)} to search")
+
+    start = time.perf_counter()
+    with Pool(workers or cpu_count()) as pool:
+        results = pool.map(_search_entry, jobs, chunksize=4)
+
+    added = np.array(results, dtype=BOOK_DTYPE)
+    book = np.concatenate([existing, added])
+    book.sort(order='key')
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, book)
+    os.replace(tmp_path, path)
+    print(f"Wrote {len(book)} positions to {path} in {time.perf_counter() - start:.1f}s")
+    return len(book)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the Connect 4 opening book")
+    parser.add_argument("--out", default=BOOK_FILE)
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=10, help="maximum search depth per position")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="seconds per position")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    build_book(args.out, args.plies, args.depth, args.time_limit, args.workers)
+
+if __name__ == "__main__":
+    main()
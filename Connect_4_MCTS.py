@@ -0,0 +1,151 @@
+import math
+import time
+
+import numpy as np
+
+from Connect_4 import Bitboard, CENTER_ORDER
+
+TOP = np.array([c * Bitboard.H + Bitboard.ROWS for c in range(Bitboard.COLS)])
+SHIFTS = [np.uint64(s) for s in (1, Bitboard.H - 1, Bitboard.H, Bitboard.H + 1)]
+ONE = np.uint64(1)
+
+def is_win_batch(masks):
+    won = np.zeros(len(masks), dtype=bool)
+    for shift in SHIFTS:
+        mm = masks & (masks >> shift)
+        won |= (mm & (mm >> (shift + shift))) != 0
+    return won
+
+def random_playouts(position, piece, batch, rng):
+    # Plays `batch` uniformly random games from `position` at once, one NumPy
+    # step per ply across all boards. Returns the winning piece per game
+    # (0 for a draw).
+    masks = np.empty((2, batch), dtype=np.uint64)
+    masks[0] = position.masks[0]
+    masks[1] = position.masks[1]
+    heights = np.tile(np.array(position.heights), (batch, 1))
+    winner = np.zeros(batch, dtype=np.int8)
+    active = np.ones(batch, dtype=bool)
+    rows = np.arange(batch)
+
+    for _ in range(Bitboard.ROWS * Bitboard.COLS - len(position.moves)):
+        idx = rows[active]
+        h = heights[idx]
+        weights = rng.random(h.shape)
+        weights[h >= TOP] = -1.0
+        cols = weights.argmax(axis=1)
+        bits = h[np.arange(len(idx)), cols]
+        heights[idx, cols] = bits + 1
+        masks[piece - 1, idx] |= ONE << bits.astype(np.uint64)
+        won = is_win_batch(masks[piece - 1, idx])
+        winner[idx[won]] = piece
+        active[idx[won]] = False
+        if not active.any():
+            break
+        piece = 3 - piece
+    return winner
+
+class MCTSNode:
+    __slots__ = ('col', 'piece', 'parent', 'children', 'untried', 'visits', 'wins', 'key', 'result')
+
+    def __init__(self, position, col=None, piece=None, parent=None):
+        self.col = col
+        self.piece = piece
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+        self.key = position.hash
+        if piece is not None and position.is_win(piece):
+            self.result = 1.0
+        elif position.is_full():
+            self.result = 0.5
+        else:
+            self.result = None
+        self.untried = [] if self.result is not None else [c for c in CENTER_ORDER if position.can_play(c)]
+
+    def select(self, c):
+        log_n = math.log(self.visits)
+        return max(self.children, key=lambda n: n.wins / n.visits + c * math.sqrt(log_n / n.visits))
+
+class MCTSPlayer:
+    # UCT search; each expansion is scored by a batch of vectorised random
+    # playouts. The tree is kept between moves and re-rooted on the position
+    # actually reached.
+    def __init__(self, iterations=None, time_limit=1.0, batch=256, c=1.4, seed=None):
+        if iterations is None and time_limit is None:
+            raise ValueError("MCTSPlayer needs an iteration count, a time limit or both")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.batch = batch
+        self.c = c
+        self.rng = np.random.default_rng(seed)
+        self.root = None
+        self.last_stats = {}
+
+    def _reroot(self, position, piece):
+        # The new position is usually a grandchild of the previous root (our
+        # move, then the opponent's), so look for it by hash two levels down.
+        if self.root is not None:
+            for child in self.root.children:
+                for node in [child] + child.children:
+                    if node.key == position.hash and node.piece == 3 - piece:
+                        node.parent = None
+                        return node
+        return MCTSNode(position, piece=3 - piece)
+
+    def choose_move(self, position, piece):
+        root = self.root = self._reroot(position, piece)
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        iterations = playouts = 0
+        reused = root.visits
+
+        # At least one iteration always runs, so the root has a child to pick
+        # even with a zero budget.
+        while True:
+            playouts += self._iterate(position.copy())
+            iterations += 1
+            if self.iterations is not None and iterations >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        best = max(root.children, key=lambda n: n.visits)
+        elapsed = time.perf_counter() - start
+        self.last_stats = {'iterations': iterations, 'playouts': playouts, 'reused_visits': reused,
+                           'seconds': elapsed, 'playouts_per_second': playouts / elapsed if elapsed else 0.0,
+                           'win_rate': float(best.wins / best.visits)}
+        return best.col
+
+    def _iterate(self, position):
+        node = self.root
+        while not node.untried and node.children and node.result is None:
+            node = node.select(self.c)
+            position.play(node.col, node.piece)
+
+        if node.result is None and node.untried:
+            col = node.untried.pop(0)
+            piece = 3 - node.piece
+            position.play(col, piece)
+            child = MCTSNode(position, col, piece, node)
+            node.children.append(child)
+            node = child
+
+        count = self.batch
+        if node.result is not None:
+            wins = node.result * count
+            simulated = 0
+        else:
+            winner = random_playouts(position, 3 - node.piece, count, self.rng)
+            wins = np.count_nonzero(winner == node.piece) + 0.5 * np.count_nonzero(winner == 0)
+            simulated = count
+
+        # `wins` is from the view of the piece that moved into `node`; flip it
+        # at every level on the way up.
+        while node is not None:
+            node.visits += count
+            node.wins += wins
+            wins = count - wins
+            node = node.parent
+        return simulated
@@ -0,0 +1,108 @@
+import argparse
+import csv
+import random
+import time
+from multiprocessing import Pool, cpu_count
+
+from Connect_4 import Connect4, Bitboard
+
+_engine = None
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = Connect4(headless=True)
+    return _engine
+
+def _replay(moves):
+    position = Bitboard()
+    for col, piece in moves:
+        position.play(col, piece)
+    return position
+
+def _search_root_move(args):
+    moves, col, depth, maximizingPlayer = args
+    game = _get_engine()
+    position = _replay(moves)
+    position.play(col, game.AI if maximizingPlayer else game.PLAYER)
+    return game.minimax_bitboard(position, depth - 1, float('-inf'), float('inf'), not maximizingPlayer, game.table)[1]
+
+def parallel_search(position, depth, maximizingPlayer=True, workers=None, pool=None):
+    # Root split: each legal move is searched in its own process with a full
+    # window, so the chosen move matches a sequential minimax of the same depth.
+    valid_moves = position.valid_moves()
+    if depth <= 0 or not valid_moves:
+        return Connect4(headless=True).minimax_bitboard(position.copy(), depth, float('-inf'), float('inf'), maximizingPlayer)
+    jobs = [(list(position.moves), col, depth, maximizingPlayer) for col in valid_moves]
+    if pool is None:
+        with Pool(workers or min(len(jobs), cpu_count())) as pool:
+            values = pool.map(_search_root_move, jobs)
+    else:
+        values = pool.map(_search_root_move, jobs)
+
+    best_col, best_value = valid_moves[0], values[0]
+    for col, value in zip(valid_moves, values):
+        if (value > best_value) if maximizingPlayer else (value < best_value):
+            best_col, best_value = col, value
+    return best_col, best_value
+
+def play_self_game(args):
+    index, seed, time_limit, depth, random_plies = args
+    game = Connect4(headless=True)
+    rng = random.Random(seed)
+    position = Bitboard()
+    first = game.PLAYER if index % 2 == 0 else game.AI
+    piece = first
+    timings = []
+    winner = 0
+
+    while True:
+        start = time.perf_counter()
+        if len(position.moves) < random_plies:
+            col = rng.choice(position.valid_moves())
+        else:
+            col = game.choose_move(position, piece, time_limit, depth)
+        timings.append(int((time.perf_counter() - start) * 1e6))
+        position.play(col, piece)
+        if position.is_win(piece):
+            winner = piece
+            break
+        if position.is_full():
+            break
+        piece = game.AI if piece == game.PLAYER else game.PLAYER
+
+    moves = ''.join(str(col) for col, _ in position.moves)
+    return index, seed, first, winner, moves, timings
+
+def self_play(games, out_path, time_limit=0.5, depth=None, workers=None, seed=0, random_plies=2):
+    # One CSV row per game: moves as a digit string of columns, per-move
+    # search times in microseconds separated by spaces.
+    jobs = [(i, seed + i, time_limit, depth, random_plies) for i in range(games)]
+    results = {0: 0, 1: 0, 2: 0}
+    start = time.perf_counter()
+
+    with open(out_path, 'w', newline='') as file, Pool(workers or cpu_count()) as pool:
+        writer = csv.writer(file)
+        writer.writerow(['game', 'seed', 'first', 'winner', 'moves', 'move_us'])
+        for index, game_seed, first, winner, moves, timings in pool.imap_unordered(play_self_game, jobs):
+            writer.writerow([index, game_seed, first, winner, moves, ' '.join(map(str, timings))])
+            results[winner] += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.1f}s  player wins: {results[1]}  AI wins: {results[2]}  draws: {results[0]}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless parallel Connect 4 self-play")
+    parser.add_argument("games", type=int)
+    parser.add_argument("--out", default="selfplay.csv")
+    parser.add_argument("--time-limit", type=float, default=0.5)
+    parser.add_argument("--depth", type=int, default=None, help="fixed search depth instead of a time limit")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--random-plies", type=int, default=2)
+    args = parser.parse_args()
+    self_play(args.games, args.out, args.time_limit, args.depth, args.workers, args.seed, args.random_plies)
+
+if __name__ == "__main__":
+    main()
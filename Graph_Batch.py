@@ -0,0 +1,101 @@
+import argparse
+import csv
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+from AFS import a_star_fast, bidirectional_a_star
+from BFS import bidirectional_bfs
+from BestFS import best_first_fast
+from Graph_Cache import load_cached
+
+# Loader options and quiet search for each algorithm; every search returns
+# (path, cost, expanded).
+def _bfs(graph, start, goal):
+    path, expanded = bidirectional_bfs(graph, start, goal)
+    return path, len(path) - 1 if path else float('inf'), expanded
+
+def _best_first(graph, start, goal):
+    return best_first_fast(graph, graph.heuristics, start, goal)
+
+def _a_star(graph, start, goal):
+    result = a_star_fast(graph, graph.heuristics, start, goal)
+    return result.path, result.cost, result.expanded
+
+def _bidirectional_a_star(graph, start, goal):
+    result = bidirectional_a_star(graph, graph.heuristics, start, goal)
+    return result.path, result.cost, result.expanded
+
+ALGORITHMS = {
+    'bfs': ({'undirected': True}, _bfs),
+    'bestfs': ({'heuristic': 'Heuristic', 'heuristic_node': 'destination'}, _best_first),
+    'astar': ({'heuristic': 'Heuristic', 'heuristic_node': 'source'}, _a_star),
+    'bidirectional-astar': ({'heuristic': 'Heuristic', 'heuristic_node': 'source'}, _bidirectional_a_star),
+}
+
+_graph = None
+_search = None
+
+def _init_worker(csv_path, algorithm):
+    # Each worker memory-maps the compiled graph, so all of them share the
+    # page-cached arrays instead of holding private copies.
+    global _graph, _search
+    options, _search = ALGORITHMS[algorithm]
+    _graph = load_cached(csv_path, **options)
+
+def _run_query(pair):
+    start, goal = pair
+    begin = time.perf_counter()
+    path, cost, expanded = _search(_graph, start, goal)
+    return start, goal, path, cost, expanded, time.perf_counter() - begin
+
+def batch_query(csv_path, pairs, algorithm='astar', workers=None, chunksize=64):
+    # Yields (start, goal, path, cost, expanded, seconds) for each pair, in
+    # input order. The graph cache is compiled once up front.
+    options, _ = ALGORITHMS[algorithm]
+    load_cached(csv_path, **options)
+    if workers == 1:
+        _init_worker(csv_path, algorithm)
+        for pair in pairs:
+            yield _run_query(pair)
+        return
+    with Pool(workers or cpu_count(), _init_worker, (csv_path, algorithm)) as pool:
+        yield from pool.imap(_run_query, pairs, chunksize)
+
+def read_pairs(file):
+    for row in csv.reader(file):
+        if len(row) >= 2 and row[:2] != ['start', 'goal']:
+            yield row[0].strip(), row[1].strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer many start/goal queries against one graph")
+    parser.add_argument("graph", help="edge list CSV")
+    parser.add_argument("queries", nargs="?", default="-", help="CSV of start,goal pairs ('-' for stdin)")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="astar")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--out", default="-", help="results CSV ('-' for stdout)")
+    args = parser.parse_args()
+
+    queries = sys.stdin if args.queries == "-" else open(args.queries, newline='')
+    out = sys.stdout if args.out == "-" else open(args.out, 'w', newline='')
+    writer = csv.writer(out)
+    writer.writerow(['start', 'goal', 'cost', 'expanded', 'latency_ms', 'path'])
+    count = 0
+    latencies = []
+    begin = time.perf_counter()
+    for start, goal, path, cost, expanded, seconds in batch_query(args.graph, read_pairs(queries), args.algorithm,
+                                                                  args.workers, args.chunksize):
+        writer.writerow([start, goal, cost, expanded, f"{seconds * 1000:.3f}", ' -> '.join(path)])
+        latencies.append(seconds)
+        count += 1
+    elapsed = time.perf_counter() - begin
+    if out is not sys.stdout:
+        out.close()
+    if count:
+        latencies.sort()
+        print(f"{count} queries in {elapsed:.2f}s ({count / elapsed:.0f}/s), "
+              f"median latency {latencies[count // 2] * 1000:.3f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
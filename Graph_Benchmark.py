@@ -0,0 +1,263 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import time
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+import AFS
+import BFS
+import BestFS
+import Menu_Driven_DFS
+from Graph_Cache import cache_files
+from Graph_Render import DEFAULT_BUDGET
+from Graph_Trace import SearchTrace
+
+# Every generator returns undirected edges (a, b), their weights and a
+# heuristic per node that never overestimates the distance to `goal`.
+# Edges are written in both directions, so the per-source heuristic column
+# (AFS) and the per-destination one (BestFS) give the same values.
+
+def grid_graph(edges, rng):
+    side = max(2, int(round((edges / 4) ** 0.5)))
+    ids = np.arange(side * side).reshape(side, side)
+    a = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    b = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    weights = 1.0 + rng.random(len(a))
+    goal = side * side - 1
+    rows, cols = np.divmod(np.arange(side * side), side)
+    # Every step costs at least 1, so the Manhattan distance is admissible.
+    heuristic = (side - 1 - rows) + (side - 1 - cols)
+    return a, b, weights, heuristic.astype(float), 0, goal
+
+def _close_pairs(xy, radius):
+    # All pairs of points closer than `radius`, using a grid of radius-sized
+    # cells so only neighbouring cells are compared.
+    g = int(1 / radius) + 1
+    cells = np.minimum((xy / radius).astype(np.int64), g - 1)
+    cell_id = cells[:, 0] * g + cells[:, 1]
+    order = np.argsort(cell_id, kind='stable')
+    sorted_ids = cell_id[order]
+    starts = np.searchsorted(sorted_ids, np.arange(g * g))
+    ends = np.searchsorted(sorted_ids, np.arange(g * g), side='right')
+    a_parts, b_parts = [], []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        cx, cy = cells[:, 0] + dx, cells[:, 1] + dy
+        i = np.nonzero((cx < g) & (cy >= 0) & (cy < g))[0]
+        other = cx[i] * g + cy[i]
+        counts = ends[other] - starts[other]
+        a = np.repeat(i, counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        b = order[np.repeat(starts[other], counts) + within]
+        keep = np.hypot(*(xy[a] - xy[b]).T) <= radius
+        if (dx, dy) == (0, 0):
+            keep &= a < b
+        a_parts.append(a[keep])
+        b_parts.append(b[keep])
+    return np.concatenate(a_parts), np.concatenate(b_parts)
+
+def _components(n, a, b):
+    # Connected-component label per node: each round hooks every label onto
+    # the smallest label it shares an edge with, then follows the label
+    # pointers to their roots, until nothing changes.
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[a], low)
+        np.minimum.at(hooked, labels[b], low)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+def _nearest(xy, point, candidates):
+    return int(candidates[np.argmin(np.hypot(*(xy[candidates] - point).T))])
+
+def geometric_graph(edges, rng, degree=8):
+    # Small graphs at this density fall apart into several components, so
+    # start and goal are picked inside the largest one.
+    n = max(4, edges // degree)
+    xy = rng.random((n, 2))
+    a, b = _close_pairs(xy, (degree / (n * np.pi)) ** 0.5)
+    length = np.hypot(*(xy[a] - xy[b]).T)
+    weights = length * (1.0 + 0.5 * rng.random(len(a)))
+    labels = _components(n, a, b)
+    largest = np.nonzero(labels == np.bincount(labels).argmax())[0]
+    start, goal = _nearest(xy, (0.1, 0.1), largest), _nearest(xy, (0.9, 0.9), largest)
+    return a, b, weights, np.hypot(*(xy - xy[goal]).T), start, goal
+
+def scale_free_graph(edges, rng, m=4):
+    # Barabasi-Albert preferential attachment; nodes also get random
+    # coordinates so the straight-line distance is an admissible heuristic.
+    n = max(m + 1, edges // (2 * m))
+    ends = list(range(m))
+    a, b = [], []
+    picks = rng.random((n, m))
+    for v in range(m, n):
+        chosen = {ends[int(p * len(ends))] for p in picks[v]} if v > m else set(range(m))
+        for u in chosen:
+            a.append(v)
+            b.append(u)
+            ends.append(u)
+            ends.append(v)
+    a, b = np.array(a), np.array(b)
+    xy = rng.random((n, 2))
+    weights = np.hypot(*(xy[a] - xy[b]).T) * (1.0 + rng.random(len(a)))
+    return a, b, weights, np.hypot(*(xy - xy[n - 1]).T), 0, n - 1
+
+GENERATORS = {'grid': grid_graph, 'geometric': geometric_graph, 'scale-free': scale_free_graph}
+# Bumped when a generator changes, so cached graphs in the workdir are redone.
+GENERATOR_VERSION = 2
+
+def write_graph_csv(path, a, b, weights, heuristic):
+    sources = np.concatenate((a, b))
+    frame = pd.DataFrame({'Source': sources, 'Destination': np.concatenate((b, a)),
+                          'Weight': np.concatenate((weights, weights)), 'Heuristic': heuristic[sources]})
+    frame.to_csv(path, index=False, float_format='%.6g')
+
+def generate(kind, edges, seed, workdir):
+    # Writes (or reuses) the CSV for one graph; returns its path, start,
+    # goal and the generation stats.
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f"{kind}_{edges}_{seed}.csv")
+    meta_path = path + '.json'
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as file:
+            meta = json.load(file)
+        if meta.get('version') == GENERATOR_VERSION:
+            return path, meta
+    start_time = time.perf_counter()
+    a, b, weights, heuristic, start, goal = GENERATORS[kind](edges, np.random.default_rng(seed))
+    write_graph_csv(path, a, b, weights, heuristic)
+    meta = {'kind': kind, 'version': GENERATOR_VERSION, 'seed': seed, 'nodes': len(heuristic), 'edges': 2 * len(a),
+            'start': str(start), 'goal': str(goal), 'generate_seconds': time.perf_counter() - start_time}
+    with open(meta_path, 'w') as file:
+        json.dump(meta, file)
+    return path, meta
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+# Each algorithm is (load, search, render). load returns (graph, heuristic);
+# search returns (path, cost), with path None for a plain traversal.
+
+def search_bfs(graph, heuristic, start, goal, trace):
+    path = BFS.bfs(graph, start, goal, verbose=False, trace=trace)
+    return path, len(path) - 1 if path else None
+
+def render_bfs(graph, heuristic, start, goal, path, out):
+    BFS.visualize_bfs_tree(graph, path, out=out)
+
+def search_dfs(graph, heuristic, start, goal, trace):
+    for _ in Menu_Driven_DFS.dfs_events(graph, start, trace=trace):
+        pass
+    return None, None
+
+def render_dfs(graph, heuristic, start, goal, path, out):
+    order = list(islice(Menu_Driven_DFS.dfs_stream(graph, start), DEFAULT_BUDGET))
+    Menu_Driven_DFS.visualize_tree(order, "DFS Tree", out=out)
+
+def search_bestfs(graph, heuristic, start, goal, trace):
+    path, cost, _ = BestFS.best_first_fast(graph, heuristic, start, goal, trace=trace)
+    return path, cost
+
+def render_bestfs(graph, heuristic, start, goal, path, out):
+    BestFS.draw_tree(nx.DiGraph(zip(path, path[1:])), set(path), out=out)
+
+def search_astar(graph, heuristic, start, goal, trace):
+    result = AFS.a_star_fast(graph, heuristic, start, goal, trace=trace)
+    return result.path, result.cost
+
+def render_astar(graph, heuristic, start, goal, path, out):
+    # The drawing needs the search tree, so this re-runs the search with
+    # record_tree set.
+    tree = AFS.a_star_fast(graph, heuristic, start, goal, record_tree=True).tree
+    AFS.draw_tree(tree, set(path), out=out)
+
+ALGORITHMS = {
+    'bfs': (lambda path: (BFS.read_graph_from_csv(path), None), search_bfs, render_bfs),
+    'dfs': (lambda path: (Menu_Driven_DFS.load_graph_from_csv(path), None), search_dfs, render_dfs),
+    'bestfs': (BestFS.read_graph_and_heuristics_from_csv, search_bestfs, render_bestfs),
+    'astar': (AFS.read_graph_and_heuristics_from_csv, search_astar, render_astar),
+}
+
+def bench_graph(csv_path, meta, algorithms=tuple(ALGORITHMS), visualize=True, memory=False):
+    # Per algorithm: a cold load (compiling the binary cache with that
+    # script's options), a warm load from the cache, the search and the
+    # rendering, each timed on its own.
+    start, goal = meta['start'], meta['goal']
+    results = {}
+    for name in algorithms:
+        load, search, render = ALGORITHMS[name]
+        for cache in cache_files(csv_path):
+            os.remove(cache)
+        _, cold = _timed(lambda: load(csv_path))
+        (graph, heuristic), warm = _timed(lambda: load(csv_path))
+        trace = SearchTrace(memory=memory)
+        (path, cost), seconds = _timed(lambda: search(graph, heuristic, start, goal, trace))
+        stats = dict(trace.stats, wall_seconds=seconds)
+        if path is not None:
+            stats.update(path_length=len(path), cost=cost)
+        entry = {'load_cold_seconds': cold, 'load_warm_seconds': warm, 'graph_mb': graph.nbytes / 1e6,
+                 'search': stats}
+        if visualize and (path or path is None):
+            out = os.path.splitext(csv_path)[0] + f"_{name}.png"
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, entry['visualize_seconds'] = _timed(lambda: render(graph, heuristic, start, goal, path, out))
+        results[name] = entry
+    return results
+
+def run(kinds=tuple(GENERATORS), sizes=(1000, 10000, 100000), seed=0, workdir="bench_graphs",
+        algorithms=tuple(ALGORITHMS), visualize=True, memory=False):
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'graphs': {}}
+    for kind in kinds:
+        for edges in sizes:
+            csv_path, meta = generate(kind, edges, seed, workdir)
+            entry = dict(meta, csv=csv_path)
+            entry['algorithms'] = bench_graph(csv_path, meta, algorithms, visualize, memory)
+            report['graphs'][f"{kind}-{edges}"] = entry
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the graph searches on synthetic graphs")
+    parser.add_argument("--out", default="graph_bench.json")
+    parser.add_argument("--kinds", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--edges", type=float, nargs="+", default=[1e3, 1e4, 1e5],
+                        help="approximate directed edge counts, up to 1e7")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default="bench_graphs", help="where generated CSVs and renders go")
+    parser.add_argument("--no-visualize", action="store_true")
+    parser.add_argument("--memory", action="store_true", help="track peak allocations (slows the searches)")
+    args = parser.parse_args()
+
+    report = run(args.kinds, [int(e) for e in args.edges], args.seed, args.workdir, args.algorithms,
+                 not args.no_visualize, args.memory)
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=1)
+
+    for name, entry in report['graphs'].items():
+        for algorithm, result in entry['algorithms'].items():
+            search = result['search']
+            render = f"  render {result['visualize_seconds']:6.2f}s" if 'visualize_seconds' in result else ""
+            print(f"{name:18s} {algorithm:7s} load {result['load_cold_seconds']:7.3f}s cold "
+                  f"{result['load_warm_seconds']:7.3f}s warm  search {search['wall_seconds']:8.3f}s "
+                  f"{search['expansions']:>9d} expanded{render}")
+    print(f"Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
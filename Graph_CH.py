@@ -0,0 +1,274 @@
+import argparse
+import heapq
+import random
+import time
+
+import numpy as np
+
+from AFS import a_star_fast, read_graph_and_heuristics_from_csv
+from Graph_CSR import NodeValues
+
+def _witness_search(out, source, excluded, targets, max_cost, settle_limit):
+    # Bounded Dijkstra in the remaining graph that skips the node being
+    # contracted; returns the distances found to `targets`.
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    found = {}
+    settled = 0
+    while pq and settled < settle_limit:
+        d_u, u = heapq.heappop(pq)
+        if d_u > dist[u]:
+            continue
+        if d_u > max_cost:
+            break
+        settled += 1
+        if u in targets:
+            found[u] = d_u
+            if len(found) == len(targets):
+                break
+        for v, (w, _) in out[u].items():
+            if v == excluded:
+                continue
+            cost = d_u + w
+            if cost < dist.get(v, float('inf')):
+                dist[v] = cost
+                heapq.heappush(pq, (cost, v))
+    return found
+
+def _shortcuts(out, inc, v, settle_limit):
+    shortcuts = []
+    for u, (c_uv, _) in inc[v].items():
+        targets = {w: c_uv + c_vw for w, (c_vw, _) in out[v].items() if w != u}
+        if not targets:
+            continue
+        found = _witness_search(out, u, v, targets, max(targets.values()), settle_limit)
+        for w, cost in targets.items():
+            if found.get(w, float('inf')) > cost:
+                shortcuts.append((u, w, cost))
+    return shortcuts
+
+def _priority(out, inc, v, deleted, settle_limit):
+    # Edge difference plus the number of already contracted neighbours.
+    return len(_shortcuts(out, inc, v, settle_limit)) - len(inc[v]) - len(out[v]) + deleted[v]
+
+def _to_csr(n, edges):
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in edges], out=offsets[1:])
+    flat = [edge for node_edges in edges for edge in node_edges]
+    targets = np.array([e[0] for e in flat], dtype=np.int32)
+    weights = np.array([e[1] for e in flat], dtype=np.float64)
+    middles = np.array([e[2] for e in flat], dtype=np.int32)
+    return offsets, targets, weights, middles
+
+class ContractionHierarchy:
+    # up[v]: edges v -> w with rank[w] > rank[v]; down[v]: edges u -> v with
+    # rank[u] > rank[v], stored at v for the backward search. Each edge
+    # keeps the node it bypasses (-1 for an original edge) for unpacking.
+    def __init__(self, names, rank, up, down, num_edges):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.num_edges = num_edges
+        self._up_views = [memoryview(a) for a in up]
+        self._down_views = [memoryview(a) for a in down]
+
+    @classmethod
+    def build(cls, graph, settle_limit=500, report=False):
+        # settle_limit caps each witness search. Below a few hundred, missed
+        # witnesses add needless shortcuts, which slow both the build and
+        # the queries.
+        start = time.perf_counter()
+        n = graph.num_nodes
+        out = [dict() for _ in range(n)]
+        inc = [dict() for _ in range(n)]
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        for u in range(n):
+            for v, w in zip(targets[offsets[u]:offsets[u + 1]].tolist(), weights[offsets[u]:offsets[u + 1]].tolist()):
+                if u != v and w < out[u].get(v, (float('inf'),))[0]:
+                    out[u][v] = (w, -1)
+                    inc[v][u] = (w, -1)
+
+        deleted = [0] * n
+        pq = [(_priority(out, inc, v, deleted, settle_limit), v) for v in range(n)]
+        heapq.heapify(pq)
+        rank = np.zeros(n, dtype=np.int32)
+        up_edges = [[] for _ in range(n)]
+        down_edges = [[] for _ in range(n)]
+        shortcuts_added = 0
+        order = 0
+
+        while pq:
+            _, v = heapq.heappop(pq)
+            # Lazy update: re-queue if the priority got worse since it was pushed.
+            priority = _priority(out, inc, v, deleted, settle_limit)
+            if pq and priority > pq[0][0]:
+                heapq.heappush(pq, (priority, v))
+                continue
+            rank[v] = order
+            order += 1
+            for u, w, cost in _shortcuts(out, inc, v, settle_limit):
+                if cost < out[u].get(w, (float('inf'),))[0]:
+                    out[u][w] = (cost, v)
+                    inc[w][u] = (cost, v)
+                    shortcuts_added += 1
+            for w, (cost, middle) in out[v].items():
+                up_edges[v].append((w, cost, middle))
+                del inc[w][v]
+                deleted[w] += 1
+            for u, (cost, middle) in inc[v].items():
+                down_edges[v].append((u, cost, middle))
+                del out[u][v]
+                deleted[u] += 1
+            out[v] = {}
+            inc[v] = {}
+
+        hierarchy = cls(graph.names, rank, _to_csr(n, up_edges), _to_csr(n, down_edges), graph.num_edges)
+        if report:
+            print(f"Contracted {n} nodes in {time.perf_counter() - start:.1f}s, {shortcuts_added} shortcuts")
+        return hierarchy
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            np.savez(file, rank=self.rank, num_edges=np.int64(self.num_edges),
+                     **{f"up_{i}": a for i, a in enumerate(self.up)}, **{f"down_{i}": a for i, a in enumerate(self.down)})
+
+    @classmethod
+    def load(cls, path, graph):
+        data = np.load(path)
+        if len(data['rank']) != graph.num_nodes or int(data['num_edges']) != graph.num_edges:
+            raise ValueError(f"{path} was built for a different graph")
+        return cls(graph.names, data['rank'], tuple(data[f"up_{i}"] for i in range(4)),
+                   tuple(data[f"down_{i}"] for i in range(4)), int(data['num_edges']))
+
+    def query(self, start, goal):
+        # Bidirectional Dijkstra that only climbs in rank; each side stops
+        # once its smallest key cannot improve the best meeting cost.
+        # Returns (path, cost); the path is unpacked to original edges.
+        inf = float('inf')
+        if start not in self.ids or goal not in self.ids:
+            return [], inf
+        s, t = self.ids[start], self.ids[goal]
+        sides = (self._up_views, self._down_views)
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: -1}, {t: -1})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        best, meet = (0.0, s) if s == t else (inf, -1)
+
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side] or heaps[side][0][0] >= best:
+                heaps[side].clear()
+                side = 1 - side
+                continue
+            d_u, u = heapq.heappop(heaps[side])
+            if d_u > dist[side][u]:
+                continue
+            offsets, targets, weights, _ = sides[side]
+            mine, other = dist[side], dist[1 - side]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                cost = d_u + weights[k]
+                if cost < mine.get(v, inf):
+                    mine[v] = cost
+                    parent[side][v] = u
+                    heapq.heappush(heaps[side], (cost, v))
+                if v in other and mine[v] + other[v] < best:
+                    best, meet = mine[v] + other[v], v
+            side = 1 - side
+
+        if meet < 0:
+            return [], inf
+        forward, node = [], meet
+        while node >= 0:
+            forward.append(node)
+            node = parent[0][node]
+        forward.reverse()
+        node = parent[1][meet]
+        while node >= 0:
+            forward.append(node)
+            node = parent[1][node]
+        path = [forward[0]]
+        for a, b in zip(forward, forward[1:]):
+            path.extend(self._unpack(a, b))
+        return [self.names[i] for i in path], best
+
+    def _middle(self, a, b):
+        if self.rank[a] < self.rank[b]:
+            offsets, targets, _, middles = self._up_views
+            node, other = a, b
+        else:
+            offsets, targets, _, middles = self._down_views
+            node, other = b, a
+        for k in range(offsets[node], offsets[node + 1]):
+            if targets[k] == other:
+                return middles[k]
+        raise KeyError((a, b))
+
+    def _unpack(self, a, b):
+        # Nodes after `a` on the original path for the (possibly shortcut)
+        # edge a -> b.
+        path = []
+        stack = [(a, b)]
+        while stack:
+            x, y = stack.pop()
+            middle = self._middle(x, y)
+            if middle < 0:
+                path.append(y)
+            else:
+                stack.append((middle, y))
+                stack.append((x, middle))
+        return path
+
+def benchmark(graph, hierarchy, queries=1000, seed=0, heuristics=None):
+    # Random start/goal pairs answered by the hierarchy and by a_star_fast.
+    # The CSV heuristic only targets one goal, so A* runs with `heuristics`
+    # if given (e.g. an ALT heuristic factory) and with h = 0 otherwise.
+    rng = random.Random(seed)
+    zero = NodeValues(graph, np.zeros(graph.num_nodes))
+    pairs = [(rng.choice(graph.names), rng.choice(graph.names)) for _ in range(queries)]
+    ch_times, astar_times, mismatches = [], [], 0
+    for start, goal in pairs:
+        begin = time.perf_counter()
+        _, ch_cost = hierarchy.query(start, goal)
+        ch_times.append(time.perf_counter() - begin)
+        h = heuristics(goal) if heuristics is not None else zero
+        begin = time.perf_counter()
+        result = a_star_fast(graph, h, start, goal)
+        astar_times.append(time.perf_counter() - begin)
+        if not (ch_cost == result.cost or abs(ch_cost - result.cost) <= 1e-9 * max(1.0, abs(ch_cost))):
+            mismatches += 1
+    ch, astar = np.array(ch_times), np.array(astar_times)
+    return {'queries': queries, 'mismatches': mismatches,
+            'ch_median_us': float(np.median(ch) * 1e6), 'ch_mean_us': float(ch.mean() * 1e6),
+            'astar_median_us': float(np.median(astar) * 1e6), 'astar_mean_us': float(astar.mean() * 1e6),
+            'speedup': float(astar.mean() / ch.mean()) if ch.mean() else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description="Contraction hierarchy index for repeated shortest-path queries")
+    parser.add_argument("command", choices=["build", "query", "bench"])
+    parser.add_argument("csv")
+    parser.add_argument("nodes", nargs="*", help="start and goal for 'query'")
+    parser.add_argument("--index", default=None)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--settle-limit", type=int, default=500, help="witness search size when building")
+    args = parser.parse_args()
+    index = args.index or args.csv + '.ch.npz'
+    graph, _ = read_graph_and_heuristics_from_csv(args.csv)
+
+    if args.command == "build":
+        ContractionHierarchy.build(graph, args.settle_limit, report=True).save(index)
+        print(f"Wrote {index}")
+        return
+    hierarchy = ContractionHierarchy.load(index, graph)
+    if args.command == "query":
+        path, cost = hierarchy.query(args.nodes[0], args.nodes[1])
+        print(f"Cost: {cost}, Path: {' -> '.join(path)}" if path else "No path found!")
+    else:
+        for key, value in benchmark(graph, hierarchy, args.queries, args.seed).items():
+            print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+class NodeValues:
+    # Per-node numbers (e.g. heuristics) stored in a float array indexed by
+    # node ID, NaN meaning "no value". Behaves like the name -> value dicts
+    # the search scripts used before.
+    def __init__(self, graph, values):
+        self.graph = graph
+        self.values = values
+        self._filled = {}
+
+    def filled(self, default):
+        # The values with missing entries replaced by `default`, computed once
+        # per default so repeated searches can index it directly.
+        if default not in self._filled:
+            self._filled[default] = np.where(np.isnan(self.values), default, self.values)
+        return self._filled[default]
+
+    def get(self, name, default=None):
+        i = self.graph.ids.get(name)
+        if i is None or np.isnan(self.values[i]):
+            return default
+        return self.values[i].item()
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.values)))
+
+class CSRGraph:
+    # Adjacency in compressed sparse row form: the out-edges of node i are
+    # targets[offsets[i]:offsets[i + 1]] (with matching weights). Node names
+    # are interned once; searches can work on the integer IDs directly.
+    # Indexing by name returns the same shape as the old dict-of-lists
+    # graphs, so the existing search functions run on it unchanged.
+    def __init__(self, names, offsets, targets, weights=None, ids=None):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)} if ids is None else ids
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.heuristics = None
+        self.load_stats = None
+        self._reverse = None
+
+    @classmethod
+    def from_edges(cls, sources, destinations, weights=None, undirected=False):
+        ids = {}
+        names = []
+
+        def intern(name):
+            i = ids.get(name)
+            if i is None:
+                i = ids[name] = len(names)
+                names.append(name)
+            return i
+
+        src = np.empty(len(sources), dtype=np.int32)
+        dst = np.empty(len(destinations), dtype=np.int32)
+        for k, (s, d) in enumerate(zip(sources, destinations)):
+            src[k] = intern(s)
+            dst[k] = intern(d)
+        return cls.from_ids(names, src, dst, None if weights is None else np.asarray(weights), undirected)
+
+    @classmethod
+    def from_ids(cls, names, src, dst, weights=None, undirected=False, ids=None):
+        if undirected:
+            # Interleave each edge with its reverse so every node keeps its
+            # neighbours in file order, as the dict-of-lists loaders did.
+            src, dst = np.column_stack((src, dst)).ravel(), np.column_stack((dst, src)).ravel()
+            if weights is not None:
+                weights = np.repeat(weights, 2)
+        order = np.argsort(src, kind='stable')
+        counts = np.bincount(src, minlength=len(names))
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        targets = dst[order].astype(np.int32, copy=False)
+        if weights is not None:
+            weights = weights[order]
+        return cls(names, offsets, targets, weights, ids)
+
+    def reverse(self):
+        # The transposed graph (every edge flipped), built once and shared.
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.offsets))
+            self._reverse = CSRGraph.from_ids(self.names, self.targets, sources, self.weights, ids=self.ids)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def node_values(self, names, values):
+        array = np.full(len(self.names), np.nan)
+        array[[self.ids[name] for name in names]] = np.asarray(values, dtype=float)
+        return NodeValues(self, array)
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        total = self.offsets.nbytes + self.targets.nbytes
+        if self.weights is not None:
+            total += self.weights.nbytes
+        return total
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def name_of(self, node_id):
+        return self.names[node_id]
+
+    def neighbors(self, node_id):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def edge_weights(self, node_id):
+        return self.weights[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def __getitem__(self, name):
+        i = self.ids[name]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        names = self.names
+        neighbors = [names[j] for j in self.targets[start:end].tolist()]
+        if self.weights is None:
+            return neighbors
+        return list(zip(neighbors, self.weights[start:end].tolist()))
+
+    def get(self, name, default=None):
+        if name not in self.ids:
+            return default
+        return self[name]
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+def load_csv(path, source='Source', destination='Destination', weight='Weight', heuristic=None,
+             heuristic_node='source', undirected=False, chunksize=None, weight_dtype='float64', report=False):
+    # Reads the edge list column-wise with fixed dtypes and builds the CSR
+    # arrays without a Python loop over rows; only newly seen node names are
+    # touched individually. With `chunksize`, the file is streamed so only
+    # the integer edge arrays, not the text, have to fit in memory. Columns
+    # can be given by name or position. The heuristic column (if any) is
+    # attached to the returned graph as `graph.heuristics`.
+    start = time.perf_counter()
+    header = list(pd.read_csv(path, nrows=0).columns)
+
+    def column(c):
+        return header[c] if isinstance(c, int) else c
+
+    source, destination = column(source), column(destination)
+    dtypes = {source: str, destination: str}
+    if weight is not None:
+        weight = column(weight)
+        dtypes[weight] = weight_dtype
+    if heuristic is not None:
+        heuristic = column(heuristic)
+        dtypes[heuristic] = 'float64'
+
+    reader = pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+    chunks = [reader] if chunksize is None else reader
+
+    names, lookup = [], {}
+    src_parts, dst_parts, weight_parts, h_ids, h_values = [], [], [], [], []
+    rows = 0
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=[source, destination])
+        rows += len(chunk)
+        # Interleave source/destination so IDs follow first appearance in the
+        # file, the same order the dict-of-lists loaders produced.
+        pairs = np.column_stack((chunk[source].to_numpy(), chunk[destination].to_numpy())).ravel()
+        codes, uniques = pd.factorize(pairs)
+        uniques = uniques.tolist()
+        if not names:
+            ids = np.arange(len(uniques))
+            names.extend(uniques)
+            lookup.update(zip(uniques, range(len(uniques))))
+        else:
+            ids = np.empty(len(uniques), dtype=np.int64)
+            for k, name in enumerate(uniques):
+                i = lookup.get(name)
+                if i is None:
+                    i = lookup[name] = len(names)
+                    names.append(name)
+                ids[k] = i
+        node_ids = ids[codes].astype(np.int32).reshape(-1, 2)
+        src_parts.append(node_ids[:, 0])
+        dst_parts.append(node_ids[:, 1])
+        if weight is not None:
+            weight_parts.append(chunk[weight].to_numpy(weight_dtype))
+        if heuristic is not None:
+            h_ids.append(node_ids[:, 0 if heuristic_node == 'source' else 1])
+            h_values.append(chunk[heuristic].to_numpy('float64'))
+
+    def joined(parts, dtype):
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    graph = CSRGraph.from_ids(names, joined(src_parts, np.int32), joined(dst_parts, np.int32),
+                              joined(weight_parts, weight_dtype) if weight is not None else None,
+                              undirected, lookup)
+    if heuristic is not None:
+        values = np.full(len(names), np.nan)
+        # Later rows overwrite earlier ones, like repeated dict assignment.
+        values[joined(h_ids, np.int32)] = joined(h_values, 'float64')
+        graph.heuristics = NodeValues(graph, values)
+
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    graph.load_stats = {'rows': rows, 'nodes': graph.num_nodes, 'edges': graph.num_edges, 'seconds': elapsed,
+                        'rows_per_second': rows / elapsed if elapsed else 0.0,
+                        'mb_per_second': size / 1e6 / elapsed if elapsed else 0.0}
+    if report:
+        print(f"Loaded {rows} rows ({graph.num_nodes} nodes, {graph.num_edges} edges) from {path} "
+              f"in {elapsed:.3f}s: {graph.load_stats['rows_per_second']:.0f} rows/s, "
+              f"{graph.load_stats['mb_per_second']:.1f} MB/s")
+    return graph
@@ -0,0 +1,133 @@
+import argparse
+import glob
+import hashlib
+import inspect
+import json
+import os
+import struct
+
+import numpy as np
+
+from Array_File import read_array_header, read_arrays, rewrite_header, write_array_file
+from Graph_CSR import CSRGraph, NodeValues, load_csv
+
+MAGIC = b'AIGRAPH\x00'
+CACHE_VERSION = 2
+
+def cache_path_for(csv_path, options=None):
+    # One cache file per CSV and set of load_csv options, so the scripts that
+    # read the same CSV differently don't keep recompiling each other's cache.
+    key = json.dumps(normalized_options(options or {}), sort_keys=True)
+    return f"{csv_path}.{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.graph"
+
+def cache_files(csv_path):
+    return glob.glob(glob.escape(csv_path) + '.*.graph')
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+            'sha256': file_sha256(csv_path)}
+
+def write_graph(graph, path, source=None, options=None):
+    names = np.frombuffer('\x00'.join(graph.names).encode('utf-8'), dtype=np.uint8)
+    arrays = {'offsets': graph.offsets, 'targets': graph.targets, 'names': names}
+    if graph.weights is not None:
+        arrays['weights'] = graph.weights
+    if graph.heuristics is not None:
+        arrays['heuristics'] = graph.heuristics.values
+    header = {'source': source, 'options': options or {}, 'num_nodes': graph.num_nodes}
+    write_array_file(path, MAGIC, CACHE_VERSION, header, arrays)
+
+def read_header(path):
+    return read_array_header(path, MAGIC, CACHE_VERSION, "graph cache file")
+
+def read_graph(path):
+    version, header, data_start = read_header(path)
+    if version != CACHE_VERSION:
+        raise ValueError(f"{path} has cache version {version}, expected {CACHE_VERSION}")
+    arrays = read_arrays(path, header, data_start)
+    names = arrays['names'].tobytes().decode('utf-8').split('\x00') if header['num_nodes'] else []
+    graph = CSRGraph(names, arrays['offsets'], arrays['targets'], arrays.get('weights'))
+    if 'heuristics' in arrays:
+        graph.heuristics = NodeValues(graph, arrays['heuristics'])
+    return graph
+
+def refresh_source(path, header):
+    # Records the CSV's new mtime after a hash check, so the next load passes
+    # the cheap check. The header is rewritten in place when it still fits;
+    # otherwise the whole cache file is rewritten.
+    if not rewrite_header(path, MAGIC, header):
+        write_graph(read_graph(path), path, header['source'], header['options'])
+
+def is_fresh(csv_path, cache_path, options):
+    # Cheap check on mtime and size first; only hash the CSV when those
+    # differ, so touching a file without changing it keeps the cache.
+    try:
+        version, header, _ = read_header(cache_path)
+    except (OSError, ValueError, struct.error):
+        return False
+    if version != CACHE_VERSION or header['options'] != options:
+        return False
+    stat = os.stat(csv_path)
+    source = header['source']
+    if source['mtime_ns'] == stat.st_mtime_ns and source['size'] == stat.st_size:
+        return True
+    if source['size'] != stat.st_size or source['sha256'] != file_sha256(csv_path):
+        return False
+    try:
+        refresh_source(cache_path, dict(header, source=dict(source, mtime_ns=stat.st_mtime_ns)))
+    except OSError:
+        pass
+    return True
+
+def normalized_options(options):
+    # The load_csv arguments that affect the graph, with defaults filled in,
+    # so caches compiled from the CLI and from the scripts match.
+    bound = inspect.signature(load_csv).bind(None, **options)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    for name in ('path', 'chunksize', 'report'):
+        arguments.pop(name)
+    return json.loads(json.dumps(arguments))
+
+def compile_graph(csv_path, cache_path=None, **options):
+    cache_path = cache_path or cache_path_for(csv_path, options)
+    graph = load_csv(csv_path, **options)
+    write_graph(graph, cache_path, source_info(csv_path), normalized_options(options))
+    return graph
+
+def load_cached(csv_path, cache_path=None, **options):
+    # Returns the graph for `csv_path`, memory-mapped from its cache file
+    # when that is still valid, otherwise parsed from the CSV and re-cached.
+    cache_path = cache_path or cache_path_for(csv_path, options)
+    if is_fresh(csv_path, cache_path, normalized_options(options)):
+        return read_graph(cache_path)
+    try:
+        return compile_graph(csv_path, cache_path, **options)
+    except OSError:
+        return load_csv(csv_path, **options)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a CSV edge list into a memory-mappable graph cache")
+    parser.add_argument("csv")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--undirected", action="store_true")
+    parser.add_argument("--heuristic", default=None, help="heuristic column name")
+    parser.add_argument("--heuristic-node", default="source", choices=["source", "destination"])
+    args = parser.parse_args()
+    options = {'undirected': args.undirected}
+    if args.heuristic:
+        options.update(heuristic=args.heuristic, heuristic_node=args.heuristic_node)
+    out = args.out or cache_path_for(args.csv, options)
+    graph = compile_graph(args.csv, out, **options)
+    print(f"Wrote {out}: {graph.num_nodes} nodes, {graph.num_edges} edges")
+
+if __name__ == "__main__":
+    main()
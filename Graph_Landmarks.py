@@ -0,0 +1,142 @@
+import argparse
+import heapq
+import random
+from array import array
+
+import numpy as np
+
+from Graph_Cache import load_cached
+
+# float32 tables: allow for rounding when subtracting two stored distances.
+EPS = 2.0 ** -22
+
+def dijkstra(graph, source):
+    offsets, targets, weights = memoryview(graph.offsets), memoryview(graph.targets), memoryview(graph.weights)
+    inf = float('inf')
+    dist = array('d', [inf]) * graph.num_nodes
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    while pq:
+        d_u, u = heapq.heappop(pq)
+        if d_u > dist[u]:
+            continue
+        for v, w in zip(targets[offsets[u]:offsets[u + 1]].tolist(), weights[offsets[u]:offsets[u + 1]].tolist()):
+            cost = d_u + w
+            if cost < dist[v]:
+                dist[v] = cost
+                heapq.heappush(pq, (cost, v))
+    return np.frombuffer(dist, dtype=np.float64)
+
+def select_landmarks(graph, k, seed=0):
+    # Farthest-point selection: each new landmark is the reachable node
+    # farthest from all landmarks chosen so far, which spreads them towards
+    # the edges of the graph where ALT bounds are tightest.
+    rng = random.Random(seed)
+    start = rng.randrange(graph.num_nodes)
+    closest = dijkstra(graph, start)
+    landmarks = []
+    while len(landmarks) < min(k, graph.num_nodes):
+        candidates = np.where(np.isfinite(closest), closest, -1.0)
+        if landmarks:
+            candidates[landmarks] = -1.0
+        node = int(candidates.argmax())
+        if candidates[node] < 0:
+            break
+        landmarks.append(node)
+        closest = np.minimum(closest, dijkstra(graph, node))
+    return landmarks
+
+class LandmarkTables:
+    # forward[i, v] = d(landmark_i, v) and backward[i, v] = d(v, landmark_i),
+    # stored as float32 with inf for unreachable.
+    def __init__(self, landmarks, forward, backward, num_edges):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.num_edges = num_edges
+
+    @classmethod
+    def build(cls, graph, k=8, seed=0):
+        landmarks = select_landmarks(graph, k, seed)
+        reverse = graph.reverse()
+        forward = np.array([dijkstra(graph, L) for L in landmarks], dtype=np.float32)
+        backward = np.array([dijkstra(reverse, L) for L in landmarks], dtype=np.float32)
+        return cls(np.array(landmarks, dtype=np.int64), forward, backward, graph.num_edges)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            np.savez(file, landmarks=self.landmarks, forward=self.forward, backward=self.backward,
+                     num_edges=np.int64(self.num_edges))
+
+    @classmethod
+    def load(cls, path, graph=None):
+        data = np.load(path)
+        tables = cls(data['landmarks'], data['forward'], data['backward'], int(data['num_edges']))
+        if graph is not None and (tables.forward.shape[1] != graph.num_nodes or tables.num_edges != graph.num_edges):
+            raise ValueError(f"{path} was built for a different graph")
+        return tables
+
+    def heuristic(self, graph, goal, base=None):
+        return ALTHeuristic(self, graph, goal, base)
+
+class ALTHeuristic:
+    # Admissible lower bound on d(v, goal) from the triangle inequality:
+    # max over landmarks L of d(L, goal) - d(L, v) and d(v, L) - d(goal, L).
+    # With `base` (e.g. the CSV heuristic) the larger of the two bounds is
+    # used; nodes missing from `base` still get the landmark bound. Works
+    # both as a dict-like for a_star_search and as an indexable for the
+    # array-based searches.
+    def __init__(self, tables, graph, goal, base=None):
+        self.graph = graph
+        t = graph.ids[goal]
+        self.rows = list(zip([memoryview(row) for row in tables.forward], [memoryview(row) for row in tables.backward],
+                             tables.forward[:, t].tolist(), tables.backward[:, t].tolist()))
+        self.base = memoryview(base.filled(0.0)) if base is not None else None
+
+    def bound(self, v):
+        inf = float('inf')
+        best = 0.0
+        for forward, backward, to_goal, from_goal in self.rows:
+            d_lv = forward[v]
+            if d_lv != inf:
+                if to_goal == inf:
+                    return inf
+                b = to_goal - d_lv - EPS * (to_goal + d_lv)
+                if b > best:
+                    best = b
+            if from_goal != inf:
+                d_vl = backward[v]
+                if d_vl == inf:
+                    return inf
+                b = d_vl - from_goal - EPS * (d_vl + from_goal)
+                if b > best:
+                    best = b
+        if self.base is not None and self.base[v] > best:
+            best = self.base[v]
+        return best
+
+    def __getitem__(self, v):
+        return self.bound(v)
+
+    def filled(self, default):
+        return self
+
+    def get(self, name, default=None):
+        v = self.graph.ids.get(name)
+        return default if v is None else self.bound(v)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute landmark (ALT) distance tables for A*")
+    parser.add_argument("csv")
+    parser.add_argument("-k", "--landmarks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    graph = load_cached(args.csv, heuristic='Heuristic', heuristic_node='source')
+    tables = LandmarkTables.build(graph, args.landmarks, args.seed)
+    out = args.out or args.csv + '.alt.npz'
+    tables.save(out)
+    print(f"Wrote {len(tables.landmarks)} landmarks for {graph.num_nodes} nodes to {out}")
+
+if __name__ == "__main__":
+    main()
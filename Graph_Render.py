@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import re
+
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_BUDGET = 200
+LAYOUT_DIR = ".layouts"
+
+def select_nodes(seeds, neighbors, budget=DEFAULT_BUDGET, hops=1):
+    # The seed nodes (usually the path) plus everything within `hops` steps
+    # of them, breadth-first, stopping at `budget` nodes. hops=None keeps
+    # expanding until the budget is reached.
+    selected = {}
+    for node in seeds:
+        if len(selected) >= budget:
+            return list(selected)
+        selected.setdefault(node, None)
+    frontier = list(selected)
+    depth = 0
+    while frontier and (hops is None or depth < hops):
+        next_frontier = []
+        for node in frontier:
+            for neighbor in neighbors(node):
+                if neighbor not in selected:
+                    if len(selected) >= budget:
+                        return list(selected)
+                    selected[neighbor] = None
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        depth += 1
+    return list(selected)
+
+def tree_layout(G, root=None):
+    # Layered layout for search trees: y is the breadth-first depth from
+    # `root`, leaves are spread out left to right in depth-first order and
+    # every parent sits above the middle of its children. Non-tree edges
+    # are ignored for placement. Linear in the size of the graph.
+    nodes = list(G.nodes())
+    if not nodes:
+        return {}
+    undirected = G.to_undirected(as_view=True) if G.is_directed() else G
+    depth, children, roots = {}, {}, []
+    for start in ([root] if root in G else []) + nodes:
+        if start in depth:
+            continue
+        roots.append(start)
+        depth[start] = 0
+        order = [start]
+        for node in order:
+            children[node] = []
+            successors = G.successors(node) if G.is_directed() else undirected.neighbors(node)
+            for neighbor in list(successors) + list(undirected.neighbors(node)):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[node] + 1
+                    children[node].append(neighbor)
+                    order.append(neighbor)
+
+    x = {}
+    leaf = 0
+    stack = [(r, False) for r in reversed(roots)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            kids = children[node]
+            x[node] = sum(x[k] for k in kids) / len(kids)
+        elif not children[node]:
+            x[node] = leaf
+            leaf += 1
+        else:
+            stack.append((node, True))
+            stack.extend((k, False) for k in reversed(children[node]))
+    width = max(leaf - 1, 1)
+    height = max(max(depth.values()), 1)
+    return {node: (x[node] / width, -depth[node] / height) for node in nodes}
+
+def _layout_key(G, root, layout):
+    edges = sorted(f"{u}\t{v}" for u, v in G.edges())
+    text = "\n".join([layout, str(root), str(G.is_directed())] + sorted(map(str, G.nodes())) + edges)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def cached_layout(G, root=None, layout="tree", cache_dir=LAYOUT_DIR):
+    # Node positions from `layout` ("tree" or "spring"), reused from
+    # cache_dir when the same graph was laid out before.
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, _layout_key(G, root, layout) + ".json")
+        if os.path.exists(path):
+            with open(path) as file:
+                stored = json.load(file)
+            names = {str(node): node for node in G.nodes()}
+            return {names[name]: tuple(xy) for name, xy in stored.items()}
+    if layout == "tree":
+        pos = tree_layout(G, root)
+    else:
+        pos = nx.spring_layout(G, seed=42)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({str(node): [float(x), float(y)] for node, (x, y) in pos.items()}, file)
+    return pos
+
+def render(G, path=(), title="", out=None, root=None, budget=DEFAULT_BUDGET, hops=1, layout="tree",
+           show=False, cache_dir=LAYOUT_DIR, node_color="lightblue", path_color="yellow",
+           path_edge_color="blue", edge_labels=True, font_size=8):
+    # Draws G with the nodes in `path` highlighted. Graphs larger than
+    # `budget` are cut down to the path plus its `hops`-neighbourhood
+    # first. The figure is written to `out` (default: a PNG named after the
+    # title) without needing a display; show=True opens a window instead.
+    # Returns the file written, or None when shown.
+    path = list(path)
+    if root is None:
+        if G.is_directed():
+            root = next((n for n, d in G.in_degree() if d == 0), None)
+        elif path:
+            root = path[0]
+    if G.number_of_nodes() > budget:
+        undirected = G.to_undirected(as_view=True) if G.is_directed() else G
+        G = G.subgraph(select_nodes(path or ([root] if root is not None else list(G)[:1]), undirected.neighbors,
+                                    budget, hops))
+    pos = cached_layout(G, root, layout, cache_dir)
+    on_path = set(path)
+    colors = [path_color if node in on_path else node_color for node in G.nodes()]
+    edge_colors = [path_edge_color if u in on_path and v in on_path else "gray" for u, v in G.edges()]
+
+    if show:
+        import matplotlib.pyplot as plt
+        figure = plt.figure(figsize=(12, 10))
+        ax = figure.gca()
+    else:
+        figure = Figure(figsize=(12, 10))
+        FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+    nx.draw(G, pos, ax=ax, with_labels=True, node_size=1000 if len(G) <= 50 else 300, node_color=colors,
+            font_size=font_size, font_weight="bold", edge_color=edge_colors, width=2)
+    labels = nx.get_edge_attributes(G, "weight")
+    if edge_labels and labels:
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=font_size, ax=ax)
+    ax.set_title(title, fontsize=12)
+    if show:
+        plt.show()
+        return None
+    if out is None:
+        out = (re.sub(r"[^A-Za-z0-9]+", "_", title).strip("_") or "graph") + ".png"
+    figure.savefig(out)
+    return out
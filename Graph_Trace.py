@@ -0,0 +1,97 @@
+import json
+import resource
+import time
+import tracemalloc
+
+class TraceWriter:
+    # One compact JSON object per line: {"e": event, "n": node, ...}, with a
+    # final "done" record holding the counters.
+    def __init__(self, path):
+        self.file = open(path, "w") if isinstance(path, str) else path
+        self._owned = isinstance(path, str)
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SearchTrace:
+    # Instrumentation for the graph searches: pass one as `trace=` and the
+    # search calls start/expand/push/goal/finish on it. Searches only touch
+    # the trace behind an `is not None` check, so leaving it out costs
+    # nothing. Callbacks get (node, cost, frontier) for expand,
+    # (node, parent, cost) for push and (node, cost) for goal; nodes are
+    # reported by name. memory=True tracks peak Python allocations with
+    # tracemalloc, which slows the search down noticeably.
+    def __init__(self, on_expand=None, on_push=None, on_goal=None, writer=None, memory=False):
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_goal = on_goal
+        self.writer = writer
+        self.memory = memory
+        self.stats = {}
+        self._names = None
+
+    def _name(self, node):
+        return node if self._names is None or node is None else self._names[node]
+
+    def start(self, algorithm, start, goal, names=None):
+        # `names` maps node IDs to names when the search works on IDs.
+        self._names = names
+        self.expansions = self.pushes = self.max_frontier = 0
+        self.stats = {}
+        if self.memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.writer is not None:
+            self.writer.write({"e": "start", "a": algorithm, "s": start, "g": goal})
+        self._started = time.perf_counter()
+
+    def expand(self, node, cost=None, frontier=0):
+        self.expansions += 1
+        if frontier > self.max_frontier:
+            self.max_frontier = frontier
+        if self.on_expand is not None or self.writer is not None:
+            name = self._name(node)
+            if self.on_expand is not None:
+                self.on_expand(name, cost, frontier)
+            if self.writer is not None:
+                self.writer.write({"e": "x", "n": name, "c": cost, "f": frontier})
+
+    def push(self, node, parent=None, cost=None):
+        self.pushes += 1
+        if self.on_push is not None or self.writer is not None:
+            name, parent = self._name(node), self._name(parent)
+            if self.on_push is not None:
+                self.on_push(name, parent, cost)
+            if self.writer is not None:
+                self.writer.write({"e": "p", "n": name, "p": parent, "c": cost})
+
+    def goal(self, node, cost=None):
+        name = self._name(node)
+        if self.on_goal is not None:
+            self.on_goal(name, cost)
+        if self.writer is not None:
+            self.writer.write({"e": "goal", "n": name, "c": cost})
+
+    def finish(self):
+        elapsed = time.perf_counter() - self._started
+        peak = None
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.stats = {"expansions": self.expansions, "pushes": self.pushes, "max_frontier": self.max_frontier,
+                      "seconds": elapsed, "peak_bytes": peak,
+                      "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+        if self.writer is not None:
+            self.writer.write(dict(e="done", **self.stats))
+        return self.stats
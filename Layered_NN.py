@@ -0,0 +1,230 @@
+import numpy as np
+
+from Multi_Layer_NN import train_epochs
+
+class Sigmoid:
+    def forward(self, x):
+        # exp of a non-positive number only, so large |x| can't overflow
+        e = np.exp(-np.abs(x))
+        return np.where(x >= 0, 1 / (1 + e), e / (1 + e)).astype(x.dtype, copy=False)
+
+    def backward(self, a, grad):
+        return grad * a * (1 - a)
+
+class Tanh:
+    def forward(self, x):
+        return np.tanh(x)
+
+    def backward(self, a, grad):
+        return grad * (1 - a * a)
+
+class ReLU:
+    def forward(self, x):
+        return np.maximum(x, 0)
+
+    def backward(self, a, grad):
+        return grad * (a > 0)
+
+class Softmax:
+    def forward(self, x):
+        e = np.exp(x - x.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+    def backward(self, a, grad):
+        return a * (grad - np.sum(grad * a, axis=1, keepdims=True))
+
+class Identity:
+    def forward(self, x):
+        return x
+
+    def backward(self, a, grad):
+        return grad
+
+ACTIVATIONS = {'sigmoid': Sigmoid, 'tanh': Tanh, 'relu': ReLU, 'softmax': Softmax, 'identity': Identity}
+
+class SSE:
+    # Half the summed squared error: the loss the original classes descend.
+    def value(self, output, y):
+        return 0.5 * float(np.sum((output - y) ** 2))
+
+    def delta(self, output, y, activation):
+        return activation.backward(output, output - y)
+
+class MSE:
+    def value(self, output, y):
+        return float(np.mean((output - y) ** 2))
+
+    def delta(self, output, y, activation):
+        return activation.backward(output, (output - y) * (2 / output.size))
+
+class CrossEntropy:
+    # Mean cross-entropy over the batch; with a softmax or sigmoid output the
+    # gradient at the pre-activation simplifies to (output - y) / batch.
+    def value(self, output, y):
+        output = np.clip(output, 1e-12, 1 - 1e-12)
+        if output.shape[1] == 1:
+            return float(-np.mean(y * np.log(output) + (1 - y) * np.log(1 - output)))
+        return float(-np.sum(y * np.log(output)) / len(output))
+
+    def delta(self, output, y, activation):
+        if isinstance(activation, (Softmax, Sigmoid)):
+            return (output - y) / len(output)
+        clipped = np.clip(output, 1e-12, 1 - 1e-12)
+        return activation.backward(output, -y / clipped / len(output))
+
+LOSSES = {'sse': SSE, 'mse': MSE, 'cross_entropy': CrossEntropy}
+
+class SGD:
+    def __init__(self, lr=0.1):
+        self.lr = lr
+        self.state = []
+
+    def step(self, params, grads):
+        for p, g in zip(params, grads):
+            p -= self.lr * g
+
+class Momentum:
+    def __init__(self, lr=0.01, beta=0.9):
+        self.lr = lr
+        self.beta = beta
+        self.state = []
+
+    def step(self, params, grads):
+        if not self.state:
+            self.state = [np.zeros_like(p) for p in params]
+        for p, g, v in zip(params, grads, self.state):
+            v *= self.beta
+            v += g
+            p -= self.lr * v
+
+class Adam:
+    def __init__(self, lr=0.001, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.lr = lr
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.t = 0
+        self.state = []
+
+    def step(self, params, grads):
+        # state holds the first moments of every parameter, then the second.
+        if not self.state:
+            self.state = [np.zeros_like(p) for p in params] + [np.zeros_like(p) for p in params]
+        self.t += 1
+        n = len(params)
+        scale = self.lr * np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for p, g, m, v in zip(params, grads, self.state[:n], self.state[n:]):
+            m *= self.beta1
+            m += (1 - self.beta1) * g
+            v *= self.beta2
+            v += (1 - self.beta2) * g * g
+            p -= scale * m / (np.sqrt(v) + self.eps)
+
+OPTIMIZERS = {'sgd': SGD, 'momentum': Momentum, 'adam': Adam}
+
+class Dense:
+    def __init__(self, weights, bias, activation):
+        self.w = weights
+        self.b = bias
+        self.activation = activation
+
+class Network:
+    # A stack of dense layers: sizes [inputs, hidden..., outputs] with one
+    # activation per layer (a name, or a list of names). Plain SGD on the
+    # half summed squared error with sigmoid layers is exactly what
+    # NeuralNetwork and SimpleMLP do; see from_neural_network and
+    # from_simple_mlp.
+    def __init__(self, sizes, activations='sigmoid', loss='sse', optimizer='sgd', dtype=np.float64, init='auto',
+                 seed=None):
+        if isinstance(activations, str):
+            activations = [activations] * (len(sizes) - 1)
+        self.sizes = list(sizes)
+        self.activation_names = list(activations)
+        self.loss_name = loss
+        self.loss_fn = LOSSES[loss]()
+        self.optimizer = OPTIMIZERS[optimizer]() if isinstance(optimizer, str) else optimizer
+        self.dtype = np.dtype(dtype)
+        rng = np.random.default_rng(seed)
+        self.layers = []
+        for fan_in, fan_out, name in zip(sizes, sizes[1:], activations):
+            kind = init if init != 'auto' else ('he' if name == 'relu' else 'xavier')
+            if kind == 'empty':
+                # left uninitialised, for callers that set the weights next
+                weights = np.empty((fan_in, fan_out))
+            elif kind == 'rand':
+                weights = rng.random((fan_in, fan_out))
+            elif kind == 'he':
+                weights = rng.normal(0, np.sqrt(2 / fan_in), (fan_in, fan_out))
+            else:
+                weights = rng.normal(0, np.sqrt(2 / (fan_in + fan_out)), (fan_in, fan_out))
+            self.layers.append(Dense(weights.astype(dtype), np.zeros((1, fan_out), dtype=dtype),
+                                     ACTIVATIONS[name]()))
+
+    @classmethod
+    def from_neural_network(cls, nn):
+        network = cls([nn.w1.shape[0], nn.w2.shape[0], nn.w3.shape[0], nn.w3.shape[1]], optimizer=SGD(nn.lr),
+                      dtype=nn.w1.dtype)
+        network.set_params([nn.w1, nn.b1, nn.w2, nn.b2, nn.w3, nn.b3])
+        return network
+
+    @classmethod
+    def from_simple_mlp(cls, mlp, learning_rate=0.1):
+        network = cls([mlp.N, mlp.N, mlp.N, 1], optimizer=SGD(learning_rate), dtype=mlp.w1.dtype)
+        network.set_params([mlp.w1, mlp.b1, mlp.w2, mlp.b2, mlp.w3, mlp.b3])
+        return network
+
+    @property
+    def params(self):
+        return [p for layer in self.layers for p in (layer.w, layer.b)]
+
+    def set_params(self, params):
+        for layer, w, b in zip(self.layers, params[::2], params[1::2]):
+            layer.w = np.array(w, dtype=self.dtype)
+            layer.b = np.array(b, dtype=self.dtype)
+
+    def forward(self, X):
+        self.inputs = []
+        a = np.asarray(X, dtype=self.dtype)
+        for layer in self.layers:
+            self.inputs.append(a)
+            a = layer.activation.forward(a @ layer.w + layer.b)
+        self.output = a
+        return a
+
+    def gradients(self, y):
+        # Gradients of the loss for the last forward pass, in params order.
+        y = np.asarray(y, dtype=self.dtype)
+        delta = self.loss_fn.delta(self.output, y, self.layers[-1].activation)
+        grads = []
+        for i in range(len(self.layers) - 1, -1, -1):
+            layer = self.layers[i]
+            grads.append(np.sum(delta, axis=0, keepdims=True))
+            grads.append(self.inputs[i].T @ delta)
+            if i:
+                delta = self.layers[i - 1].activation.backward(self.inputs[i], delta @ layer.w.T)
+        return grads[::-1]
+
+    def backward(self, X, y):
+        self.optimizer.step(self.params, self.gradients(y))
+
+    def train(self, X, y, epochs=10000):
+        for _ in range(epochs):
+            self.forward(X)
+            self.backward(X, y)
+
+    def loss(self, X, y):
+        return self.loss_fn.value(self.forward(X), np.asarray(y, dtype=self.dtype))
+
+    def predict(self, X):
+        return self.forward(X).copy()
+
+    def train_batches(self, X, y=None, epochs=1000, batch_size=32, shuffle=True, seed=None, tol=1e-6, patience=10,
+                      report=False, target=None):
+        # Mini-batch training through Multi_Layer_NN.train_epochs; the epoch
+        # loss is this network's loss averaged over the batches.
+        def step(X_batch, y_batch):
+            loss = self.loss_fn.value(self.forward(X_batch), y_batch)
+            self.backward(X_batch, y_batch)
+            return loss, 1
+
+        return train_epochs(step, X, y, self.dtype, epochs, batch_size, shuffle, seed, tol, patience, report, target)
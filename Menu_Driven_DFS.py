@@ -1,19 +1,9 @@
-import csv
 import networkx as nx
-import matplotlib.pyplot as plt
+from Graph_Cache import load_cached
+from Graph_Render import DEFAULT_BUDGET, render
 
 def load_graph_from_csv(file_path):
-    graph = {}
-    with open(file_path, 'r') as file:
-        reader = csv.reader(file)
-        next(reader)
-        for Source, Dest in reader:
-            if Source not in graph:
-                graph[Source] = []
-            graph[Source].append(Dest)
-            if Dest not in graph:
-                graph[Dest] = []
-    return graph
+    return load_cached(file_path, source=0, destination=1, weight=None)
 
 def dfs_recursive(graph, node, visited, result):
     visited.add(node)
@@ -22,30 +12,89 @@ def dfs_recursive(graph, node, visited, result):
         if neighbor not in visited:
             dfs_recursive(graph, neighbor, visited, result)
 
-def dfs_iterative(graph, start):
+def dfs_iterative(graph, start, trace=None):
+    # `trace` is an optional Graph_Trace.SearchTrace.
     stack = [start]
     visited = set()
     result = []
+    if trace is not None:
+        trace.start("dfs", start, None)
     while stack:
         node = stack.pop()
         if node not in visited:
             visited.add(node)
             result.append(node)
+            if trace is not None:
+                trace.expand(node, None, len(stack))
             for neighbor in reversed(graph[node]):
                 if neighbor not in visited:
                     stack.append(neighbor)
+                    if trace is not None:
+                        trace.push(neighbor, node)
+    if trace is not None:
+        trace.finish()
     return result
 
-def visualize_tree(traversal_order, title):
+def dfs_events(graph, start, max_depth=None, trace=None):
+    # Depth-first traversal with an explicit stack, so deep graphs don't hit
+    # the recursion limit. Yields ("pre", node, depth) when a node is first
+    # reached, in the same order as dfs_recursive, and ("post", node, depth)
+    # once all its descendants are done. Nodes at `max_depth` are visited
+    # but not expanded. Stop early by breaking out of the loop; the only
+    # state kept is the visited bitmap and one frame per level of the path.
+    # `trace` (a Graph_Trace.SearchTrace) sees a push and an expand per
+    # visited node, with the stack depth as the frontier size; it is only
+    # finished if the traversal runs to the end.
+    if start not in graph:
+        return
+    names = graph.names
+    offsets, targets = memoryview(graph.offsets), memoryview(graph.targets)
+    visited = bytearray(graph.num_nodes)
+    s = graph.ids[start]
+    visited[s] = 1
+    if trace is not None:
+        trace.start("dfs", start, None, names)
+        trace.expand(s, 0, 1)
+    yield "pre", start, 0
+    stack = [(s, iter(targets[offsets[s]:offsets[s + 1]]) if max_depth != 0 else iter(()), 0)]
+    while stack:
+        u, neighbors, depth = stack[-1]
+        for v in neighbors:
+            if not visited[v]:
+                visited[v] = 1
+                if trace is not None:
+                    trace.push(v, u, depth + 1)
+                    trace.expand(v, depth + 1, len(stack) + 1)
+                yield "pre", names[v], depth + 1
+                if max_depth is None or depth + 1 < max_depth:
+                    stack.append((v, iter(targets[offsets[v]:offsets[v + 1]]), depth + 1))
+                else:
+                    yield "post", names[v], depth + 1
+                break
+        else:
+            stack.pop()
+            yield "post", names[u], depth
+    if trace is not None:
+        trace.finish()
+
+def dfs_stream(graph, start, max_depth=None):
+    # Nodes in recursive-DFS order, produced lazily.
+    for event, node, _ in dfs_events(graph, start, max_depth):
+        if event == "pre":
+            yield node
+
+def visualize_tree(traversal_order, title, out=None, budget=DEFAULT_BUDGET, show=False):
+    # Only the first `budget` nodes of the traversal are drawn.
+    traversal_order = traversal_order[:budget]
     tree = nx.DiGraph()
+    tree.add_nodes_from(traversal_order)
     for i in range(len(traversal_order) - 1):
         tree.add_edge(traversal_order[i], traversal_order[i + 1])
 
-    plt.figure(figsize=(8, 6))
-    pos = nx.spring_layout(tree, seed=42)  # Fixed layout for consistency
-    nx.draw(tree, pos, with_labels=True, node_color="lightgreen", node_size=800, font_size=10, edge_color="black")
-    plt.title(title)
-    plt.show()
+    out = render(tree, traversal_order, title, out=out, budget=budget, show=show,
+                 path_color="lightgreen", path_edge_color="black", font_size=10)
+    if out:
+        print(f"Saved traversal to {out}")
 
 def main():
     file_path = "DFS.csv"
@@ -56,7 +105,8 @@ def main():
         print("\nMenu:")
         print("1. Perform and Visualize Recursive DFS")
         print("2. Perform and Visualize Iterative DFS")
-        print("3. Exit")
+        print("3. Stream DFS (optional depth limit)")
+        print("4. Exit")
         choice = input("Enter your choice: ")
 
         if choice == '1':
@@ -78,6 +128,14 @@ def main():
             else:
                 print("Invalid start node!")
         elif choice == '3':
+            start_node = input("Enter the start node for Streaming DFS: ")
+            depth = input("Enter the depth limit (blank for none): ")
+            if start_node in graph:
+                for node in dfs_stream(graph, start_node, int(depth) if depth.strip() else None):
+                    print(node)
+            else:
+                print("Invalid start node!")
+        elif choice == '4':
             print("Exiting program.")
             break
         else:
@@ -1,3 +1,5 @@
+import time
+
 import numpy as np
 
 def sigmoid(x):
@@ -6,23 +8,158 @@ def sigmoid(x):
 def sigmoid_derivative(x):
     return x * (1 - x)
 
+def sigmoid_inplace(x):
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+def iterate_batches(X, y, batch_size, shuffle, rng, dtype):
+    if callable(X):
+        for X_batch, y_batch in X():
+            yield np.asarray(X_batch, dtype=dtype), np.asarray(y_batch, dtype=dtype)
+        return
+    if shuffle and not isinstance(X, np.memmap):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), batch_size):
+            rows = order[start:start + batch_size]
+            yield np.asarray(X[rows], dtype=dtype), np.asarray(y[rows], dtype=dtype)
+        return
+    # Memory-mapped data is read in contiguous slices; shuffling only
+    # changes the order of the slices, so each read stays sequential.
+    starts = np.arange(0, len(X), batch_size)
+    if shuffle:
+        rng.shuffle(starts)
+    for start in starts:
+        rows = slice(start, start + batch_size)
+        yield np.asarray(X[rows], dtype=dtype), np.asarray(y[rows], dtype=dtype)
+
+def train_epochs(step, X, y=None, dtype=np.float64, epochs=1000, batch_size=32, shuffle=True, seed=None, tol=1e-6,
+                 patience=10, report=False, target=None):
+    # The mini-batch training loop shared by NeuralNetwork and
+    # Layered_NN.Network. X and y are arrays or memory-mapped arrays
+    # (np.load(path, mmap_mode='r')), of which only one batch is in memory
+    # at a time, or X is a callable returning a fresh iterator of
+    # (X_batch, y_batch) pairs for each epoch. step(X_batch, y_batch) trains
+    # on one batch and returns (loss total, count); the epoch loss is the
+    # sum of totals over the sum of counts. Training stops once the loss
+    # reaches `target`, or hasn't improved by more than `tol` for `patience`
+    # epochs (patience=None always runs every epoch). Returns one stats dict
+    # per epoch.
+    rng = np.random.default_rng(seed)
+    history = []
+    best, stale = float('inf'), 0
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        total, count, samples = 0.0, 0, 0
+        for X_batch, y_batch in iterate_batches(X, y, batch_size, shuffle, rng, dtype):
+            batch_total, batch_count = step(X_batch, y_batch)
+            total += batch_total
+            count += batch_count
+            samples += len(X_batch)
+        elapsed = time.perf_counter() - start
+        loss = total / count if count else 0.0
+        history.append({'epoch': epoch, 'loss': loss, 'samples': samples, 'seconds': elapsed,
+                        'samples_per_second': samples / elapsed if elapsed else 0.0})
+        if report:
+            print(f"Epoch {epoch}: loss {loss:.6f}, {history[-1]['samples_per_second']:.0f} samples/s")
+        if target is not None and loss <= target:
+            break
+        if loss < best - tol:
+            best, stale = loss, 0
+        else:
+            stale += 1
+            if patience is not None and stale >= patience:
+                break
+    return history
+
 class NeuralNetwork:
-    def __init__(self, input_size, hidden1, hidden2, output_size, learning_rate):
+    def __init__(self, input_size, hidden1, hidden2, output_size, learning_rate, dtype=np.float64, inplace=False,
+                 init='rand'):
+        # inplace=True runs forward/backward on buffers allocated once per
+        # batch size; forward then returns a buffer that the next call
+        # overwrites. dtype=np.float32 halves the memory traffic.
         self.lr = learning_rate
-        self.w1 = np.random.rand(input_size, hidden1)
-        self.b1 = np.zeros((1, hidden1))
-        self.w2 = np.random.rand(hidden1, hidden2)
-        self.b2 = np.zeros((1, hidden2))
-        self.w3 = np.random.rand(hidden2, output_size)
-        self.b3 = np.zeros((1, output_size))
+        self.dtype = np.dtype(dtype)
+        self.inplace = inplace
+        weights = (lambda *shape: np.empty(shape, dtype=dtype)) if init == 'empty' else np.random.rand
+        self.w1 = weights(input_size, hidden1).astype(dtype, copy=False)
+        self.b1 = np.zeros((1, hidden1), dtype=dtype)
+        self.w2 = weights(hidden1, hidden2).astype(dtype, copy=False)
+        self.b2 = np.zeros((1, hidden2), dtype=dtype)
+        self.w3 = weights(hidden2, output_size).astype(dtype, copy=False)
+        self.b3 = np.zeros((1, output_size), dtype=dtype)
+        self._buffers = {}
+        self._grads = None
+
+    def _batch_buffers(self, batch):
+        buffers = self._buffers.get(batch)
+        if buffers is None:
+            def empty(columns):
+                return np.empty((batch, columns), dtype=self.dtype)
+            hidden1, hidden2, outputs = self.w1.shape[1], self.w2.shape[1], self.w3.shape[1]
+            buffers = self._buffers[batch] = {
+                'x': empty(self.w1.shape[0]), 'z1': empty(hidden1), 'z2': empty(hidden2), 'output': empty(outputs),
+                'd1': empty(hidden1), 'd2': empty(hidden2), 'd3': empty(outputs),
+                't1': empty(hidden1), 't2': empty(hidden2), 't3': empty(outputs)}
+        return buffers
+
+    def _input(self, X, buffers):
+        if isinstance(X, np.ndarray) and X.dtype == self.dtype and X.flags.c_contiguous:
+            return X
+        np.copyto(buffers['x'], X, casting='unsafe')
+        return buffers['x']
+
+    def _forward_inplace(self, X):
+        buffers = self._batch_buffers(len(X))
+        X = self._input(X, buffers)
+        self.z1 = sigmoid_inplace(np.add(np.dot(X, self.w1, out=buffers['z1']), self.b1, out=buffers['z1']))
+        self.z2 = sigmoid_inplace(np.add(np.dot(self.z1, self.w2, out=buffers['z2']), self.b2, out=buffers['z2']))
+        self.output = sigmoid_inplace(np.add(np.dot(self.z2, self.w3, out=buffers['output']), self.b3,
+                                             out=buffers['output']))
+        return self.output
+
+    def _backward_inplace(self, X, y):
+        buffers = self._batch_buffers(len(X))
+        X = self._input(X, buffers)
+        if self._grads is None:
+            self._grads = [np.empty_like(a) for a in (self.w1, self.b1, self.w2, self.b2, self.w3, self.b3)]
+        g1, gb1, g2, gb2, g3, gb3 = self._grads
+
+        def delta(error, activation, scratch):
+            # error * sigmoid_derivative(activation), without temporaries
+            np.subtract(1, activation, out=scratch)
+            scratch *= activation
+            error *= scratch
+            return error
+
+        d_output = delta(np.subtract(y, self.output, out=buffers['d3']), self.output, buffers['t3'])
+        d_z2 = delta(np.dot(d_output, self.w3.T, out=buffers['d2']), self.z2, buffers['t2'])
+        d_z1 = delta(np.dot(d_z2, self.w2.T, out=buffers['d1']), self.z1, buffers['t1'])
+        for weight, bias, grad, bias_grad, inputs, d in ((self.w3, self.b3, g3, gb3, self.z2, d_output),
+                                                         (self.w2, self.b2, g2, gb2, self.z1, d_z2),
+                                                         (self.w1, self.b1, g1, gb1, X, d_z1)):
+            np.dot(inputs.T, d, out=grad)
+            grad *= self.lr
+            weight += grad
+            np.sum(d, axis=0, keepdims=True, out=bias_grad)
+            bias_grad *= self.lr
+            bias += bias_grad
 
     def forward(self, X):
+        if self.inplace:
+            return self._forward_inplace(X)
+        X = np.asarray(X, dtype=self.dtype)
         self.z1 = sigmoid(np.dot(X, self.w1) + self.b1)
         self.z2 = sigmoid(np.dot(self.z1, self.w2) + self.b2)
         self.output = sigmoid(np.dot(self.z2, self.w3) + self.b3)
         return self.output
 
     def backward(self, X, y):
+        if self.inplace:
+            return self._backward_inplace(X, y)
+        X = np.asarray(X, dtype=self.dtype)
+        y = np.asarray(y, dtype=self.dtype)
         output_error = y - self.output
         d_output = output_error * sigmoid_derivative(self.output)
         z2_error = d_output.dot(self.w3.T)
@@ -41,23 +178,40 @@ class NeuralNetwork:
             self.forward(X)
             self.backward(X, y)
 
+    def loss(self, X, y):
+        return float(np.mean((y - self.forward(X)) ** 2))
+
+    def train_batches(self, X, y=None, epochs=1000, batch_size=32, shuffle=True, seed=None, tol=1e-6, patience=10,
+                      report=False):
+        # Mini-batch training through train_epochs; the epoch loss is the
+        # mean squared error seen during the epoch.
+        def step(X_batch, y_batch):
+            output = self.forward(X_batch)
+            squared_error = float(np.sum((y_batch - output) ** 2))
+            values = output.size
+            self.backward(X_batch, y_batch)
+            return squared_error, values
+
+        return train_epochs(step, X, y, self.dtype, epochs, batch_size, shuffle, seed, tol, patience, report)
+
 
-X = np.array([
-    [0, 0],
-    [0, 1],
-    [1, 0],
-    [1, 1]
-])
+if __name__ == "__main__":
+    X = np.array([
+        [0, 0],
+        [0, 1],
+        [1, 0],
+        [1, 1]
+    ])
 
-y = np.array([[0], [1], [1], [0]])
+    y = np.array([[0], [1], [1], [0]])
 
 
-nn = NeuralNetwork(input_size=2, hidden1=4, hidden2=4, output_size=1, learning_rate=0.1)
+    nn = NeuralNetwork(input_size=2, hidden1=4, hidden2=4, output_size=1, learning_rate=0.1)
 
 
-nn.train(X, y, epochs=10000)
+    nn.train(X, y, epochs=10000)
 
 
-predictions = nn.forward(X)
-print("Predictions after training:")
-print(np.round(predictions, 2))
+    predictions = nn.forward(X)
+    print("Predictions after training:")
+    print(np.round(predictions, 2))
@@ -1,30 +1,55 @@
 import numpy as np
 
+from Multi_Layer_NN import sigmoid_inplace
+
 def sigmoid(x):
     return 1 / (1 + np.exp(-x))
 
 
 
 class SimpleMLP:
-    def __init__(self, N):
+    def __init__(self, N, dtype=np.float64, inplace=False, init='rand'):
+        # dtype and inplace work as in Multi_Layer_NN.NeuralNetwork.
         self.N = N
-        self.w1 = np.random.rand(N, N)
-        self.b1 = np.zeros((1, N))
-        self.w2 = np.random.rand(N, N)
-        self.b2 = np.zeros((1, N))
-        self.w3 = np.random.rand(N, 1)
-        self.b3 = np.zeros((1, 1))
+        self.dtype = np.dtype(dtype)
+        self.inplace = inplace
+        weights = (lambda *shape: np.empty(shape, dtype=dtype)) if init == 'empty' else np.random.rand
+        self.w1 = weights(N, N).astype(dtype, copy=False)
+        self.b1 = np.zeros((1, N), dtype=dtype)
+        self.w2 = weights(N, N).astype(dtype, copy=False)
+        self.b2 = np.zeros((1, N), dtype=dtype)
+        self.w3 = weights(N, 1).astype(dtype, copy=False)
+        self.b3 = np.zeros((1, 1), dtype=dtype)
+        self._buffers = {}
+
+    def _forward_inplace(self, x):
+        buffers = self._buffers.get(len(x))
+        if buffers is None:
+            buffers = self._buffers[len(x)] = [np.empty((len(x), columns), dtype=self.dtype)
+                                                for columns in (self.N, self.N, self.N, 1)]
+        x_buffer, z1, z2, output = buffers
+        if not (isinstance(x, np.ndarray) and x.dtype == self.dtype and x.flags.c_contiguous):
+            np.copyto(x_buffer, x, casting='unsafe')
+            x = x_buffer
+        self.z1 = sigmoid_inplace(np.add(np.dot(x, self.w1, out=z1), self.b1, out=z1))
+        self.z2 = sigmoid_inplace(np.add(np.dot(self.z1, self.w2, out=z2), self.b2, out=z2))
+        self.output = sigmoid_inplace(np.add(np.dot(self.z2, self.w3, out=output), self.b3, out=output))
+        return self.output
 
     def forward(self, x):
+        if self.inplace:
+            return self._forward_inplace(x)
+        x = np.asarray(x, dtype=self.dtype)
         self.z1 = sigmoid(np.dot(x, self.w1) + self.b1)
         self.z2 = sigmoid(np.dot(self.z1, self.w2) + self.b2)
         self.output = sigmoid(np.dot(self.z2, self.w3) + self.b3)
         return self.output
 
-N = 4
-mlp = SimpleMLP(N)
-input_data = np.random.randint(0, 2, (1, N))
-output = mlp.forward(input_data)
+if __name__ == "__main__":
+    N = 4
+    mlp = SimpleMLP(N)
+    input_data = np.random.randint(0, 2, (1, N))
+    output = mlp.forward(input_data)
 
-print("Input:", input_data)
-print("Output:", output)
+    print("Input:", input_data)
+    print("Output:", output)
@@ -0,0 +1,101 @@
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from Layered_NN import SGD, Adam, Momentum, Network
+
+def xor_task(rng):
+    X = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=float)
+    return X, np.array([[0], [1], [1], [0]], dtype=float)
+
+def parity_task(rng, bits=6):
+    X = np.array([[(i >> b) & 1 for b in range(bits)] for i in range(1 << bits)], dtype=float)
+    return X, X.sum(axis=1, keepdims=True) % 2
+
+def spirals_task(rng, points=600, classes=3):
+    # Interleaved spiral arms, one class per arm, with one-hot targets.
+    per_class = points // classes
+    radius = np.tile(np.linspace(0.05, 1, per_class), classes)
+    labels = np.repeat(np.arange(classes), per_class)
+    angle = labels * 2 * np.pi / classes + radius * 8 + rng.normal(0, 0.1, len(radius))
+    X = np.column_stack((radius * np.sin(angle), radius * np.cos(angle)))
+    return X, np.eye(classes)[labels]
+
+# name: (data, hidden sizes, batch size, target MSE on the whole set)
+TASKS = {
+    'xor': (xor_task, [4, 4], 4, 0.01),
+    'parity6': (parity_task, [16, 16], 16, 0.02),
+    'spirals': (spirals_task, [32, 32], 32, 0.05),
+}
+
+def configurations(outputs):
+    # The first one is exactly NeuralNetwork (sigmoid layers, plain SGD on
+    # the summed squared error); the others change activations and optimizer.
+    last = 'softmax' if outputs > 1 else 'sigmoid'
+    return {
+        'sigmoid-sgd': dict(activations='sigmoid', loss='sse', optimizer=lambda: SGD(0.1), init='rand'),
+        'tanh-momentum': dict(activations='tanh', last=last, loss='cross_entropy', optimizer=lambda: Momentum(0.05)),
+        'relu-adam': dict(activations='relu', last=last, loss='cross_entropy', optimizer=lambda: Adam(0.01)),
+    }
+
+def time_to_target(task, config, seed, max_epochs=5000, time_limit=30.0):
+    make_data, hidden, batch_size, target = TASKS[task]
+    X, y = make_data(np.random.default_rng(seed))
+    sizes = [X.shape[1]] + hidden + [y.shape[1]]
+    activations = [config['activations']] * len(hidden) + [config.get('last', config['activations'])]
+    network = Network(sizes, activations, config['loss'], config['optimizer'](), init=config.get('init', 'auto'),
+                      seed=seed)
+    seconds = 0.0
+    mse = float(np.mean((network.forward(X) - y) ** 2))
+    for epoch in range(1, max_epochs + 1):
+        history = network.train_batches(X, y, epochs=1, batch_size=batch_size, seed=seed * max_epochs + epoch,
+                                        patience=None)
+        seconds += history[-1]['seconds']
+        mse = float(np.mean((network.forward(X) - y) ** 2))
+        if mse <= target or seconds > time_limit:
+            break
+    return {'reached': mse <= target, 'epochs': epoch, 'seconds': seconds, 'mse': mse}
+
+def run(tasks=tuple(TASKS), seeds=(0, 1, 2), max_epochs=5000, time_limit=30.0):
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tasks': {}}
+    for task in tasks:
+        X, y = TASKS[task][0](np.random.default_rng(0))
+        entry = {'target_mse': TASKS[task][3], 'samples': len(X), 'configs': {}}
+        for name, config in configurations(y.shape[1]).items():
+            runs = [time_to_target(task, config, seed, max_epochs, time_limit) for seed in seeds]
+            reached = [r for r in runs if r['reached']]
+            entry['configs'][name] = {
+                'runs': runs, 'reached': len(reached),
+                'median_seconds': float(np.median([r['seconds'] for r in reached])) if reached else None,
+                'median_epochs': float(np.median([r['epochs'] for r in reached])) if reached else None}
+        report['tasks'][task] = entry
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-target-loss benchmark for the layered network")
+    parser.add_argument("--out", default="nn_bench.json")
+    parser.add_argument("--tasks", nargs="+", choices=list(TASKS), default=list(TASKS))
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--max-epochs", type=int, default=5000)
+    parser.add_argument("--time-limit", type=float, default=30.0, help="training seconds per run")
+    args = parser.parse_args()
+
+    report = run(args.tasks, tuple(range(args.seeds)), args.max_epochs, args.time_limit)
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=1)
+
+    for task, entry in report['tasks'].items():
+        for name, result in entry['configs'].items():
+            if result['reached']:
+                print(f"{task:8s} {name:14s} {result['reached']}/{args.seeds} reached MSE {entry['target_mse']} "
+                      f"in {result['median_seconds']:.3f}s ({result['median_epochs']:.0f} epochs, median)")
+            else:
+                print(f"{task:8s} {name:14s} did not reach MSE {entry['target_mse']}")
+    print(f"Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+import Array_File
+from Layered_NN import OPTIMIZERS, Network
+from Multi_Layer_NN import NeuralNetwork
+from NLP import SimpleMLP
+
+MAGIC = b'AINNCKP\x00'
+CHECKPOINT_VERSION = 1
+
+def read_header(path):
+    version, header, data_start = Array_File.read_array_header(path, MAGIC, CHECKPOINT_VERSION, "model checkpoint")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} has checkpoint version {version}, expected {CHECKPOINT_VERSION}")
+    return header, data_start
+
+def _optimizer_config(optimizer):
+    name = next(key for key, cls in OPTIMIZERS.items() if isinstance(optimizer, cls))
+    return {'name': name, 'settings': {k: v for k, v in vars(optimizer).items() if k != 'state'}}
+
+def save_checkpoint(model, path, epoch=0, extra=None):
+    # Weights, biases, layer config and (for Network) optimizer settings
+    # and state of a NeuralNetwork, SimpleMLP or Layered_NN.Network.
+    header = {'epoch': epoch, 'extra': extra or {}}
+    if isinstance(model, Network):
+        params = model.params
+        state = model.optimizer.state
+        header.update(kind='Network', config={'sizes': model.sizes, 'activations': model.activation_names,
+                                              'loss': model.loss_name, 'dtype': model.dtype.str,
+                                              'optimizer': _optimizer_config(model.optimizer)})
+    elif isinstance(model, NeuralNetwork):
+        params = [model.w1, model.b1, model.w2, model.b2, model.w3, model.b3]
+        state = []
+        header.update(kind='NeuralNetwork', config={
+            'sizes': [model.w1.shape[0], model.w2.shape[0], model.w3.shape[0], model.w3.shape[1]],
+            'learning_rate': model.lr, 'dtype': model.dtype.str, 'inplace': model.inplace})
+    elif isinstance(model, SimpleMLP):
+        params = [model.w1, model.b1, model.w2, model.b2, model.w3, model.b3]
+        state = []
+        header.update(kind='SimpleMLP', config={'N': model.N, 'dtype': model.dtype.str, 'inplace': model.inplace})
+    else:
+        raise TypeError(f"can't checkpoint a {type(model).__name__}")
+    arrays = {f"param_{i}": p for i, p in enumerate(params)}
+    arrays.update({f"state_{i}": s for i, s in enumerate(state)})
+    Array_File.write_array_file(path, MAGIC, CHECKPOINT_VERSION, header, arrays)
+
+def load_checkpoint(path, mode='r'):
+    # Rebuilds the model around the stored arrays without initialising new
+    # weights first. Returns (model, header). `mode` goes to
+    # Array_File.read_arrays; resuming training needs 'c' or None.
+    header, data_start = read_header(path)
+    arrays = Array_File.read_arrays(path, header, data_start, mode)
+    config = header['config']
+    layers = len(config['sizes']) - 1 if header['kind'] == 'Network' else 3
+    params = [arrays[f"param_{i}"] for i in range(2 * layers)]
+    state = [arrays[f"state_{i}"] for i in range(sum(name.startswith('state_') for name in arrays))]
+
+    if header['kind'] == 'Network':
+        settings = config['optimizer']['settings']
+        optimizer = OPTIMIZERS[config['optimizer']['name']](**{k: v for k, v in settings.items() if k != 't'})
+        if 't' in settings:
+            optimizer.t = settings['t']
+        optimizer.state = state
+        model = Network(config['sizes'], config['activations'], config['loss'], optimizer, np.dtype(config['dtype']),
+                        init='empty')
+        for layer, w, b in zip(model.layers, params[::2], params[1::2]):
+            layer.w, layer.b = w, b
+        return model, header
+
+    if header['kind'] == 'NeuralNetwork':
+        model = NeuralNetwork(*config['sizes'], config['learning_rate'], np.dtype(config['dtype']), config['inplace'],
+                              init='empty')
+    else:
+        model = SimpleMLP(config['N'], np.dtype(config['dtype']), config['inplace'], init='empty')
+    model.w1, model.b1, model.w2, model.b2, model.w3, model.b3 = params
+    return model, header
+
+def train_with_checkpoints(model, X, y, path, epochs, every=1, seed=0, **options):
+    # Runs model.train_batches `every` epochs at a time and saves a
+    # checkpoint after each chunk. If `path` already exists, training
+    # resumes from it (weights, optimizer state and epoch count) and `model`
+    # is only used when there is nothing to resume. Each epoch's shuffle
+    # seed depends only on the epoch number, so a resumed run sees the same
+    # batches as an uninterrupted one. Every epoch runs (no early stopping).
+    # Returns the model and the history of this call.
+    epoch = 0
+    if os.path.exists(path):
+        model, header = load_checkpoint(path, mode=None)
+        epoch = header['epoch']
+    history = []
+    while epoch < epochs:
+        chunk = min(every, epochs - epoch)
+        for offset in range(chunk):
+            result = model.train_batches(X, y, epochs=1, seed=seed + epoch + offset, patience=None, **options)
+            history.append(dict(result[-1], epoch=epoch + offset + 1))
+        epoch += chunk
+        save_checkpoint(model, path, epoch)
+    return model, history
+
+def main():
+    parser = argparse.ArgumentParser(description="Show what a model checkpoint holds")
+    parser.add_argument("checkpoint")
+    args = parser.parse_args()
+    header, _ = read_header(args.checkpoint)
+    print(f"{header['kind']} at epoch {header['epoch']}: {json.dumps(header['config'])}")
+    for name, (_, dtype, shape) in header['arrays'].items():
+        print(f"  {name}: {dtype} {shape}")
+
+if __name__ == "__main__":
+    main()
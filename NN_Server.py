@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from NLP import SimpleMLP
+from NN_Checkpoint import load_checkpoint
+
+def input_width(model):
+    if hasattr(model, 'layers'):
+        return model.layers[0].w.shape[0]
+    return model.w1.shape[0]
+
+class MicroBatcher:
+    # Collects single-row requests and runs them through model.forward as
+    # one batch, once max_batch rows are waiting or the oldest request has
+    # waited max_delay seconds. Works with any model with a forward(X)
+    # method (NeuralNetwork, SimpleMLP, Layered_NN.Network).
+    def __init__(self, model, max_batch=64, max_delay=0.002, samples=100000):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.width = input_width(model)
+        self.samples = samples
+        self.queue = None
+        self._task = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        # Percentiles come from the latest `samples` rows only, so a long-running
+        # server doesn't keep one float per request forever.
+        self.latencies = deque(maxlen=self.samples)
+        self.batches = 0
+        self.rows = 0
+        self._since = time.perf_counter()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def predict(self, row):
+        # Rows are checked here, so one malformed request can't break the
+        # batch it would have landed in.
+        row = np.asarray(row)
+        if row.shape != (self.width,):
+            raise ValueError(f"expected a row of {self.width} values, got shape {row.shape}")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def predict_many(self, rows):
+        return await asyncio.gather(*(self.predict(row) for row in rows))
+
+    async def _run(self):
+        queue = self.queue
+        while True:
+            items = [await queue.get()]
+            deadline = items[0][2] + self.max_delay
+            while len(items) < self.max_batch:
+                if not queue.empty():
+                    items.append(queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                # Copied, since in-place models reuse their output buffer.
+                outputs = np.array(self.model.forward(np.stack([row for row, _, _ in items])))
+            except Exception:
+                # Retry the rows one by one so only the ones that fail on
+                # their own get the error.
+                outputs = []
+                for row, future, _ in items:
+                    try:
+                        outputs.append(np.array(self.model.forward(row[np.newaxis]))[0])
+                    except Exception as error:
+                        outputs.append(None)
+                        if not future.done():
+                            future.set_exception(error)
+            done = time.perf_counter()
+            for (_, future, queued), output in zip(items, outputs):
+                if output is None:
+                    continue
+                if not future.done():
+                    future.set_result(output)
+                self.latencies.append(done - queued)
+                self.rows += 1
+            self.batches += 1
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._since
+        latencies = np.array(self.latencies) * 1000
+        return {'rows': self.rows, 'batches': self.batches,
+                'mean_batch': self.rows / self.batches if self.batches else 0.0,
+                'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+                'rows_per_second': self.rows / elapsed if elapsed else 0.0}
+
+def _response(status, payload):
+    body = json.dumps(payload).encode()
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+async def _handle(batcher, reader, writer):
+    # Minimal HTTP/1.1 with keep-alive: POST /predict with
+    # {"inputs": row or [rows]} answers {"outputs": ...}; GET /stats.
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, path = line.decode().split()[:2]
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, value = header.decode().split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length < 0:
+                    raise ValueError(f"negative Content-Length {length}")
+            except ValueError as error:
+                # Where the next request starts is unknown, so answer and hang up.
+                writer.write(_response(400, {'error': f"malformed request: {error}"}))
+                await writer.drain()
+                break
+            body = await reader.readexactly(length)
+
+            if method == 'POST' and path == '/predict':
+                try:
+                    inputs = np.asarray(json.loads(body)['inputs'], dtype=float)
+                    if inputs.ndim not in (1, 2) or inputs.shape[-1] != batcher.width:
+                        raise ValueError(f"expected rows of {batcher.width} values, got shape {inputs.shape}")
+                    if inputs.ndim == 1:
+                        outputs = (await batcher.predict(inputs)).tolist()
+                    else:
+                        outputs = [output.tolist() for output in await batcher.predict_many(inputs)]
+                except (ValueError, KeyError, TypeError) as error:
+                    writer.write(_response(400, {'error': str(error)}))
+                except Exception as error:
+                    writer.write(_response(500, {'error': str(error)}))
+                else:
+                    writer.write(_response(200, {'outputs': outputs}))
+            elif method == 'GET' and path == '/stats':
+                writer.write(_response(200, batcher.stats()))
+            else:
+                writer.write(_response(404, {'error': f"no route for {method} {path}"}))
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(batcher, host='127.0.0.1', port=8000):
+    await batcher.start()
+    server = await asyncio.start_server(lambda r, w: _handle(batcher, r, w), host, port)
+    return server
+
+async def _load(batcher, inputs, concurrency):
+    # `concurrency` clients, each sending its share of rows one at a time.
+    async def client(rows):
+        for row in rows:
+            await batcher.predict(row)
+
+    await asyncio.gather(*(client(inputs[i::concurrency]) for i in range(concurrency)))
+
+async def _http_load(port, inputs, concurrency):
+    async def client(rows):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for row in rows:
+            body = json.dumps({'inputs': row.tolist()}).encode()
+            writer.write(f"POST /predict HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b''):
+                    break
+                if header.lower().startswith(b'content-length'):
+                    length = int(header.split(b':')[1])
+            if not header:
+                break
+            await reader.readexactly(length)
+        writer.close()
+
+    await asyncio.gather(*(client(inputs[i::concurrency]) for i in range(concurrency)))
+
+async def benchmark(model, inputs, concurrency=256, max_batch=64, max_delay=0.002, http=False, port=8765):
+    # Runs the same request stream unbatched (max_batch=1) and batched.
+    results = {}
+    for name, size in (('unbatched', 1), ('batched', max_batch)):
+        batcher = MicroBatcher(model, size, max_delay)
+        if http:
+            server = await serve(batcher, port=port)
+            batcher.reset_stats()
+            await _http_load(port, inputs, concurrency)
+            server.close()
+            await server.wait_closed()
+        else:
+            await batcher.start()
+            batcher.reset_stats()
+            await _load(batcher, inputs, concurrency)
+        results[name] = batcher.stats()
+        await batcher.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching inference server for the MLP models")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--n", type=int, default=64, help="SimpleMLP size")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--http", action="store_true", help="send the benchmark requests over HTTP")
+    parser.add_argument("--float32", action="store_true")
+    parser.add_argument("--checkpoint", default=None, help="serve a saved model (memory-mapped) instead")
+    args = parser.parse_args()
+
+    if args.checkpoint:
+        model, header = load_checkpoint(args.checkpoint)
+        config = header['config']
+        args.n = config['N'] if header['kind'] == 'SimpleMLP' else config['sizes'][0]
+    else:
+        model = SimpleMLP(args.n, dtype=np.float32 if args.float32 else np.float64)
+    if args.command == "serve":
+        async def run():
+            server = await serve(MicroBatcher(model, args.max_batch, args.max_delay_ms / 1000), port=args.port)
+            print(f"Serving on http://127.0.0.1:{args.port} (POST /predict, GET /stats)")
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(run())
+        return
+
+    inputs = np.random.randint(0, 2, (args.requests, args.n)).astype(float)
+    results = asyncio.run(benchmark(model, inputs, args.concurrency, args.max_batch, args.max_delay_ms / 1000,
+                                    args.http, args.port + 1))
+    for name, stats in results.items():
+        print(f"{name:10s} {stats['rows_per_second']:9.0f} rows/s  p50 {stats['p50_ms']:7.2f} ms  "
+              f"p99 {stats['p99_ms']:7.2f} ms  mean batch {stats['mean_batch']:.1f}")
+
+if __name__ == "__main__":
+    main()